@@ -1,17 +1,41 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Literal, TypedDict, cast
-
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Final, Literal, TypedDict, cast
+
+import httpx
+import orjson
+import requests
+from langchain_core.language_models import LanguageModelInput
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     BaseMessage,
     HumanMessage,
     SystemMessage,
+    ToolCall,
     ToolMessage,
 )
+from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_tavily import TavilySearch
+from langchain_tavily._utilities import TavilySearchAPIWrapper
+from pydantic import TypeAdapter
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import SQLAlchemyError
+
+from .db import ResponseCache, SessionLocal, utcnow
+from .glossary import normalise_text
+
+if TYPE_CHECKING:
+    from _hashlib import HASH
 
 SYSTEM_PROMPT = """
 You are an agricultural assistant helping smallholder farmers near Johannesburg, South Africa.
@@ -89,6 +113,9 @@ Your FINAL response (after any tool calls) must be ONLY this JSON object as plai
 Do not include any extra commentary, markdown, or explanation outside the JSON.
 """.strip()
 
+# Built once and shared by every agent call.
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
 
 class AgentSafetyFlags(TypedDict, total=False):
     mentions_dosage: bool
@@ -106,8 +133,58 @@ class AgentResponse(TypedDict):
     reasoning_summary: str
 
 
+# JSON schema for AgentResponse, enforced by Gemini while decoding (structured
+# output). The model no longer has to be trusted to follow the prompt's format
+# rules, and the fixed keys/punctuation come from the constrained decoder.
+AGENT_RESPONSE_SCHEMA: Final[dict[str, Any]] = TypeAdapter(AgentResponse).json_schema()
+
+
+AGENT_MODEL_NAME: Final[str] = "gemini-3-pro-preview"
+# Lower temperature than the Gemini 3 default to keep answers stable.
+AGENT_TEMPERATURE: Final[float] = 0.4
+
+# How long a cached agent response may be reused for the same question.
+RESPONSE_CACHE_TTL: Final[timedelta] = timedelta(days=1)
+# Entries kept in the in-process layer in front of the response_cache table.
+RESPONSE_CACHE_MEMORY_SIZE: Final[int] = 4096
+
+_GEMINI_HTTP_LIMITS: Final[httpx.Limits] = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20
+)
+
+
+class _GeminiTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    HTTP/2 transport for both of google-genai's httpx clients.
+
+    langchain passes the same client_args to google-genai's sync and async
+    clients, so this one object serves both. Supplying a transport also
+    stops google-genai from routing async calls (ainvoke, i.e. webhook and
+    /test/inbound turns) through aiohttp, which ignores the httpx options.
+    With HTTP/2, concurrent turns multiplex over one TLS connection to the
+    Gemini API instead of each holding its own HTTP/1.1 connection.
+    """
+
+    def __init__(self) -> None:
+        self._sync = httpx.HTTPTransport(http2=True, limits=_GEMINI_HTTP_LIMITS)
+        self._async = httpx.AsyncHTTPTransport(http2=True, limits=_GEMINI_HTTP_LIMITS)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._sync.handle_request(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._async.handle_async_request(request)
+
+    def close(self) -> None:
+        self._sync.close()
+
+    async def aclose(self) -> None:
+        await self._async.aclose()
+
+
 _agent_model: ChatGoogleGenerativeAI | None = None
 _tavily_tool: TavilySearch | None = None
+_agent_model_with_tools: Runnable[LanguageModelInput, AIMessage] | None = None
 
 
 def get_agent_model() -> ChatGoogleGenerativeAI:
@@ -120,15 +197,62 @@ def get_agent_model() -> ChatGoogleGenerativeAI:
     global _agent_model
     if _agent_model is None:
         _agent_model = ChatGoogleGenerativeAI(
-            model="gemini-3-pro-preview",
-            # Lower temperature than the Gemini 3 default to keep answers stable.
-            temperature=0.4,
+            model=AGENT_MODEL_NAME,
+            temperature=AGENT_TEMPERATURE,
             max_tokens=None,
             max_retries=2,
+            response_mime_type="application/json",
+            response_schema=AGENT_RESPONSE_SCHEMA,
+            client_args={"transport": _GeminiTransport()},
         )
     return _agent_model
 
 
+TAVILY_API_URL: Final[str] = "https://api.tavily.com"
+
+# One keep-alive session for all Tavily searches, so repeated and concurrent
+# tool calls reuse warm TLS connections instead of handshaking every time.
+# The urllib3 pool behind it is thread-safe; size it for parallel tool calls.
+_tavily_session = requests.Session()
+_tavily_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+
+class _PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """
+    TavilySearchAPIWrapper that sends requests through `_tavily_session`.
+
+    The upstream wrapper calls the module-level `requests.post`, which opens a
+    new connection per search.
+
+    This overrides raw_results from the private langchain_tavily._utilities
+    module, copied from langchain-tavily 0.2.x (pinned <0.3 in pyproject.toml)
+    with only the POST changed; re-check it against upstream when bumping.
+    """
+
+    def raw_results(self, query: str, **kwargs: Any) -> dict[str, Any]:  # type: ignore[override]
+        params = {"query": query, **{k: v for k, v in kwargs.items() if v is not None}}
+        headers = {
+            "Authorization": f"Bearer {self.tavily_api_key.get_secret_value()}",
+            "Content-Type": "application/json",
+            "X-Client-Source": "langchain-tavily",
+        }
+        base_url = self.api_base_url or TAVILY_API_URL
+        response = _tavily_session.post(
+            f"{base_url}/search", json=params, headers=headers, timeout=30
+        )
+        if response.status_code != 200:
+            # Same error as upstream, so the tool result tells the model why
+            # (quota, bad parameter, ...).
+            detail: Any = response.json().get("detail", {})
+            error_message = (
+                cast(dict[str, Any], detail).get("error")
+                if isinstance(detail, dict)
+                else "Unknown error"
+            )
+            raise ValueError(f"Error {response.status_code}: {error_message}")
+        return response.json()
+
+
 def get_tavily_tool() -> TavilySearch:
     """
     Lazily create Tavily search tool.
@@ -138,6 +262,8 @@ def get_tavily_tool() -> TavilySearch:
     global _tavily_tool
     if _tavily_tool is None:
         _tavily_tool = TavilySearch(
+            # The API key is read from TAVILY_API_KEY by the wrapper's validator.
+            api_wrapper=_PooledTavilySearchAPIWrapper(),  # type: ignore[reportCallIssue]
             max_results=5,
             topic="general",
             search_depth="advanced",  # better recall for agronomy
@@ -147,18 +273,78 @@ def get_tavily_tool() -> TavilySearch:
     return _tavily_tool
 
 
+def get_agent_model_with_tools() -> Runnable[LanguageModelInput, AIMessage]:
+    """
+    Gemini with the Tavily tool bound, created once.
+
+    bind_tools() converts the tool to a function declaration and validates it
+    on every call, so do it once instead of per turn.
+    """
+    global _agent_model_with_tools
+    if _agent_model_with_tools is None:
+        tools = [get_tavily_tool()]
+        _agent_model_with_tools = get_agent_model().bind_tools(tools)  # type: ignore[reportUnknownMemberType]
+    return _agent_model_with_tools
+
+
+def _invoke_tool_call(tavily_tool: TavilySearch, tool_call: ToolCall) -> ToolMessage:
+    """
+    Execute a single Tavily tool call.
+
+    Errors are returned as a ToolMessage rather than raised, so one failing
+    search does not abort the whole turn and the model can still recover.
+    """
+    try:
+        # langchain tools accept the tool_call object directly.
+        tool_result = tavily_tool.invoke(tool_call)  # type: ignore[reportUnknownMemberType]
+    except Exception as e:
+        return ToolMessage(
+            content=f"error: {e}",
+            tool_call_id=tool_call["id"] or "",
+            name=tool_call["name"],
+            status="error",
+        )
+    if not isinstance(tool_result, ToolMessage):
+        raise TypeError("TavilySearch.invoke(tool_call) did not return a ToolMessage")
+    return tool_result
+
+
+def _run_tool_calls(tavily_tool: TavilySearch, ai_msg: AIMessage) -> list[ToolMessage]:
+    """Execute the Tavily tool calls of one AIMessage concurrently."""
+    # We only have a single tool, but guard by name anyway.
+    tool_calls = [tc for tc in ai_msg.tool_calls if tc["name"] == tavily_tool.name]
+    if not tool_calls:
+        return []
+
+    # Tavily is blocking HTTP, so threads are enough to overlap the requests.
+    # Results are collected in submission order to keep tool_call_id order stable.
+    with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+        futures = [executor.submit(_invoke_tool_call, tavily_tool, tc) for tc in tool_calls]
+        return [f.result() for f in futures]
+
+
+_STOP_TOOLS_MESSAGE = HumanMessage(
+    content=(
+        "You have already used the Tavily search tool several times. "
+        "Now stop calling tools and respond with your FINAL JSON object only."
+    )
+)
+
+
 def _run_llm_with_tools(messages: list[BaseMessage]) -> AIMessage:
     """
     Simple tool-calling loop:
 
-    - Bind TavilySearch as a tool to Gemini.
+    - Use Gemini with TavilySearch bound as a tool.
     - Let Gemini decide when to call the tool.
     - Execute Tavily for each tool call and feed results back.
+      Tool calls from the same turn run concurrently, so 2–3 searches
+      cost roughly one search of wall-clock time.
     - Stop when the model returns an AIMessage with no tool_calls.
     """
     model = get_agent_model()
     tavily_tool = get_tavily_tool()
-    model_with_tools = model.bind_tools([tavily_tool])  # type: ignore[reportUnknownMemberType]
+    model_with_tools = get_agent_model_with_tools()
 
     history: list[BaseMessage] = list(messages)
     max_tool_loops = 3
@@ -171,39 +357,178 @@ def _run_llm_with_tools(messages: list[BaseMessage]) -> AIMessage:
         if not ai_msg.tool_calls:
             return ai_msg
 
-        # Execute each tool call and append the ToolMessage(s).
-        tool_messages: list[ToolMessage] = []
-        for tool_call in ai_msg.tool_calls:
-            # We only have a single tool, but guard by name anyway.
-            if tool_call["name"] != tavily_tool.name:
-                continue
-
-            # langchain tools accept the tool_call object directly.
-            tool_result = tavily_tool.invoke(tool_call)  # type: ignore[reportUnknownMemberType]
-            if not isinstance(tool_result, ToolMessage):
-                raise TypeError("TavilySearch.invoke(tool_call) did not return a ToolMessage")
-            tool_messages.append(tool_result)
-
-        history.extend(tool_messages)
+        history.extend(_run_tool_calls(tavily_tool, ai_msg))
 
     # Failsafe: if we somehow still have tool calls after max loops,
     # force the model to give its best JSON answer without more tools.
-    fallback_msg = model.invoke(
-        history
-        + [
-            HumanMessage(
-                content=(
-                    "You have already used the Tavily search tool several times. "
-                    "Now stop calling tools and respond with your FINAL JSON object only."
-                )
-            )
-        ]
-    )
+    fallback_msg = model.invoke(history + [_STOP_TOOLS_MESSAGE])
 
     # model.invoke() already returns AIMessage
     return fallback_msg
 
 
+async def _arun_tool_calls(tavily_tool: TavilySearch, ai_msg: AIMessage) -> list[ToolMessage]:
+    """Async counterpart of _run_tool_calls."""
+    tool_calls = [tc for tc in ai_msg.tool_calls if tc["name"] == tavily_tool.name]
+    # Worker threads keep the searches on the pooled Tavily session;
+    # gather() returns results in call order.
+    return list(
+        await asyncio.gather(
+            *(asyncio.to_thread(_invoke_tool_call, tavily_tool, tc) for tc in tool_calls)
+        )
+    )
+
+
+async def _arun_llm_with_tools(messages: list[BaseMessage]) -> AIMessage:
+    """
+    Async counterpart of _run_llm_with_tools.
+
+    Model calls use ainvoke(), so a turn waiting on Gemini does not hold a
+    worker thread and many turns can be in flight on one event loop.
+    """
+    model = get_agent_model()
+    tavily_tool = get_tavily_tool()
+    model_with_tools = get_agent_model_with_tools()
+
+    history: list[BaseMessage] = list(messages)
+    max_tool_loops = 3
+
+    for _ in range(max_tool_loops):
+        ai_msg = await model_with_tools.ainvoke(history)
+        history.append(ai_msg)
+
+        if not ai_msg.tool_calls:
+            return ai_msg
+
+        history.extend(await _arun_tool_calls(tavily_tool, ai_msg))
+
+    return await model.ainvoke(history + [_STOP_TOOLS_MESSAGE])
+
+
+def _content_text(msg: BaseMessage) -> str:
+    """Concatenate the text of a message whose content is a string or a list of blocks."""
+    content: str | list[Any] = msg.content  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
+    if isinstance(content, str):
+        return content
+    # content is a list - concatenate any text blocks
+    text_parts: list[str] = []
+    for block in content:
+        if isinstance(block, dict) and "text" in block:
+            text_parts.append(str(block["text"]))  # type: ignore[reportUnknownArgumentType]
+    return "".join(text_parts)
+
+
+class _JsonStringFieldStreamer:
+    """
+    Incrementally decode one string field of a JSON object while it streams in.
+
+    feed() takes the next piece of raw model output and returns any newly
+    available characters of the field's value, so the farmer-facing answer
+    can be shown before the rest of the object has been generated.
+    """
+
+    _ESCAPES: Final[dict[str, str]] = {
+        '"': '"',
+        "\\": "\\",
+        "/": "/",
+        "b": "\b",
+        "f": "\f",
+        "n": "\n",
+        "r": "\r",
+        "t": "\t",
+    }
+
+    def __init__(self, field: str) -> None:
+        self._start_re = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buf = ""
+        # Index in _buf of the next undecoded character of the value.
+        self._pos: int | None = None
+        self._done = False
+
+    def feed(self, text: str) -> str:
+        self._buf += text
+        if self._done:
+            return ""
+        if self._pos is None:
+            match = self._start_re.search(self._buf)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buf = self._buf
+        i = self._pos
+        out: list[str] = []
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self._done = True
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            # Escape sequence: wait for more input if it is incomplete.
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc != "u":
+                out.append(self._ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if i + 6 > len(buf):
+                break
+            code = int(buf[i + 2 : i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # High surrogate: needs the following \uXXXX low surrogate.
+                if i + 12 > len(buf):
+                    break
+                low = int(buf[i + 8 : i + 12], 16)
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                i += 12
+            else:
+                i += 6
+            out.append(chr(code))
+
+        self._pos = i
+        return "".join(out)
+
+
+def _extract_json_object(raw_text: str) -> str:
+    """
+    Return the first balanced top-level {...} object in `raw_text`.
+
+    Gemini occasionally wraps the JSON in chatter or a ```json fence despite
+    the system prompt. This is a single pass that tracks string literals so
+    braces inside values don't count. If no complete object is found the text
+    is returned unchanged and the JSON parser reports the error.
+    """
+    start = raw_text.find("{")
+    if start == -1:
+        return raw_text
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(raw_text)):
+        ch = raw_text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return raw_text[start : i + 1]
+    return raw_text
+
+
 def _parse_json_from_ai(ai_msg: AIMessage) -> AgentResponse:
     """
     Convert the final Gemini message into an AgentResponse dict.
@@ -214,29 +539,105 @@ def _parse_json_from_ai(ai_msg: AIMessage) -> AgentResponse:
     # Prefer .text, but fall back to .content if needed.
     raw_text = getattr(ai_msg, "text", None)
     if not raw_text:
-        content: str | list[Any] = ai_msg.content  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
-        if isinstance(content, str):
-            raw_text = content
-        else:
-            # content is a list - concatenate any text blocks
-            text_parts: list[str] = []
-            for block in content:
-                if isinstance(block, dict) and "text" in block:
-                    text_parts.append(str(block["text"]))  # type: ignore[reportUnknownArgumentType]
-            raw_text = "".join(text_parts).strip()
-            if not raw_text:
-                raise ValueError("Unexpected Gemini message content format; cannot extract text.")
+        raw_text = _content_text(ai_msg).strip()
+        if not raw_text:
+            raise ValueError("Unexpected Gemini message content format; cannot extract text.")
 
     try:
-        data = json.loads(raw_text)
-    except json.JSONDecodeError as e:
+        data = orjson.loads(_extract_json_object(raw_text))
+    except orjson.JSONDecodeError as e:
         # If we get here, the model did not follow the JSON-only rule.
         raise ValueError(f"Gemini did not return valid JSON: {e}\nRaw content:\n{raw_text}") from e
 
     return cast(AgentResponse, data)
 
 
-def run_agent(user_text: str) -> AgentResponse:
+def _response_cache_seed() -> HASH:
+    """
+    Hash of everything besides the user's text that determines the answer.
+
+    Hashed into every key, so changing the prompt or model invalidates old
+    entries instead of serving answers produced under the previous
+    configuration.
+    """
+    return hashlib.sha256(
+        "\0".join((AGENT_MODEL_NAME, str(AGENT_TEMPERATURE), SYSTEM_PROMPT, "")).encode("utf-8")
+    )
+
+
+_RESPONSE_CACHE_SEED = _response_cache_seed()
+
+# key -> (created_at, response JSON). Stores bytes so every hit decodes a fresh
+# dict that callers may mutate. Guarded by a lock: run_agent_batch and the
+# webhook's background tasks call in from several threads.
+_memory_cache: OrderedDict[str, tuple[datetime, bytes]] = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _response_cache_key(user_text: str) -> str:
+    h = _RESPONSE_CACHE_SEED.copy()
+    h.update(normalise_text(user_text).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _remember_response(key: str, created_at: datetime, response_json: bytes) -> None:
+    with _memory_cache_lock:
+        _memory_cache[key] = (created_at, response_json)
+        _memory_cache.move_to_end(key)
+        if len(_memory_cache) > RESPONSE_CACHE_MEMORY_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _get_cached_response(key: str) -> AgentResponse | None:
+    """Return a fresh cached response for `key`, or None on a miss."""
+    with _memory_cache_lock:
+        hit = _memory_cache.get(key)
+        if hit is not None:
+            _memory_cache.move_to_end(key)
+    if hit is not None:
+        created_at, response_json = hit
+        if utcnow() - created_at <= RESPONSE_CACHE_TTL:
+            return cast(AgentResponse, orjson.loads(response_json))
+
+    try:
+        with SessionLocal() as db:
+            row = db.get(ResponseCache, key)
+            if row is None:
+                return None
+            created_at = row.created_at
+            # SQLite drops tzinfo on the way back; values are always stored as UTC.
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=UTC)
+            if utcnow() - created_at > RESPONSE_CACHE_TTL:
+                return None
+            response_json = row.response_json.encode("utf-8")
+    except SQLAlchemyError:
+        # The cache is an optimisation only; never fail a turn because of it.
+        return None
+
+    _remember_response(key, created_at, response_json)
+    return cast(AgentResponse, orjson.loads(response_json))
+
+
+def _store_cached_response(key: str, response: AgentResponse) -> None:
+    created_at = utcnow()
+    response_json = orjson.dumps(response)
+    _remember_response(key, created_at, response_json)
+    try:
+        with SessionLocal() as db:
+            db.merge(
+                ResponseCache(
+                    prompt_hash=key,
+                    response_json=response_json.decode(),
+                    created_at=created_at,
+                )
+            )
+            db.commit()
+    except SQLAlchemyError:
+        pass
+
+
+def run_agent(user_text: str, *, bypass_cache: bool = False) -> AgentResponse:
     """
     Single-call agent:
       - Detects language
@@ -245,11 +646,129 @@ def run_agent(user_text: str) -> AgentResponse:
       - Uses Tavily web search when needed (via tool calls)
       - Answers in user language
       - Returns structured JSON with reasoning_summary
+
+    Responses are cached for RESPONSE_CACHE_TTL, keyed on the normalised text
+    together with the model settings and system prompt, so repeated questions
+    skip Gemini and Tavily entirely. Pass
+    `bypass_cache=True` to always call the model (e.g. when debugging prompts).
     """
+    key = _response_cache_key(user_text)
+    if not bypass_cache:
+        cached = _get_cached_response(key)
+        if cached is not None:
+            # Keep source_text faithful to this message, not the one that filled the cache.
+            cached["source_text"] = user_text
+            return cached
+
     messages: list[BaseMessage] = [
-        SystemMessage(content=SYSTEM_PROMPT),
+        _SYSTEM_MESSAGE,
         HumanMessage(content=user_text),
     ]
 
     ai_msg = _run_llm_with_tools(messages)
-    return _parse_json_from_ai(ai_msg)
+    response = _parse_json_from_ai(ai_msg)
+    _store_cached_response(key, response)
+    return response
+
+
+async def arun_agent(user_text: str, *, bypass_cache: bool = False) -> AgentResponse:
+    """
+    Async version of run_agent, for callers running on an event loop.
+
+    Cache lookups and writes hit SQLite, so they run in a worker thread.
+    """
+    key = _response_cache_key(user_text)
+    if not bypass_cache:
+        cached = await asyncio.to_thread(_get_cached_response, key)
+        if cached is not None:
+            cached["source_text"] = user_text
+            return cached
+
+    messages: list[BaseMessage] = [
+        _SYSTEM_MESSAGE,
+        HumanMessage(content=user_text),
+    ]
+
+    ai_msg = await _arun_llm_with_tools(messages)
+    response = _parse_json_from_ai(ai_msg)
+    await asyncio.to_thread(_store_cached_response, key, response)
+    return response
+
+
+def run_agent_batch(user_texts: list[str], *, max_workers: int = 8) -> list[AgentResponse]:
+    """
+    Run the agent over several messages concurrently.
+
+    Each message still gets its own tool-calling loop; this only overlaps the
+    network waits. Results are returned in the same order as `user_texts`.
+    """
+    if not user_texts:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(user_texts))) as executor:
+        return list(executor.map(run_agent, user_texts))
+
+
+def _stream_ai_message(
+    model: Any, history: list[BaseMessage]
+) -> Generator[str, None, AIMessageChunk]:
+    """
+    Stream one model call.
+
+    Yields pieces of `final_answer_user_language` as they arrive and returns
+    the gathered message once the stream is exhausted.
+    """
+    # Fresh streamer per call so text from a tool-calling turn never leaks through.
+    answer = _JsonStringFieldStreamer("final_answer_user_language")
+    gathered: AIMessageChunk | None = None
+    for chunk in model.stream(history):
+        chunk = cast(AIMessageChunk, chunk)
+        gathered = chunk if gathered is None else gathered + chunk
+        delta = answer.feed(_content_text(chunk))
+        if delta:
+            yield delta
+    if gathered is None:
+        raise ValueError("Gemini returned an empty stream.")
+    return gathered
+
+
+def run_agent_stream(
+    user_text: str, *, bypass_cache: bool = False
+) -> Iterator[str | AgentResponse]:
+    """
+    Streaming variant of run_agent.
+
+    Yields pieces of `final_answer_user_language` as soon as Gemini produces
+    them, then the complete AgentResponse as the last item. Tool calls are
+    handled exactly as in run_agent; nothing is yielded while searching.
+    """
+    key = _response_cache_key(user_text)
+    if not bypass_cache:
+        cached = _get_cached_response(key)
+        if cached is not None:
+            cached["source_text"] = user_text
+            yield cached["final_answer_user_language"]
+            yield cached
+            return
+
+    model = get_agent_model()
+    tavily_tool = get_tavily_tool()
+    model_with_tools = get_agent_model_with_tools()
+
+    history: list[BaseMessage] = [_SYSTEM_MESSAGE, HumanMessage(content=user_text)]
+    max_tool_loops = 3
+
+    for _ in range(max_tool_loops):
+        ai_msg = yield from _stream_ai_message(model_with_tools, history)
+        history.append(ai_msg)
+
+        if not ai_msg.tool_calls:
+            break
+
+        history.extend(_run_tool_calls(tavily_tool, ai_msg))
+    else:
+        # Same failsafe as _run_llm_with_tools: demand the final JSON without tools.
+        ai_msg = yield from _stream_ai_message(model, history + [_STOP_TOOLS_MESSAGE])
+
+    response = _parse_json_from_ai(ai_msg)
+    _store_cached_response(key, response)
+    yield response
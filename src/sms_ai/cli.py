@@ -1,17 +1,41 @@
 from __future__ import annotations
 
-from .db import SessionLocal
-from .pipeline import handle_message
+import argparse
+import sys
+
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal, init_db
+from .pipeline import handle_message, handle_message_stream, handle_messages
 
 CLI_TS_PHONE = "+999000000_tswana_cli"
 
 
-def chat_tsn() -> None:
+def _stream_turn(db: Session, user_input: str) -> None:
+    """Run one CLI turn, printing the answer as it streams in."""
+    streamed: list[str] = []
+
+    def on_delta(delta: str) -> None:
+        streamed.append(delta)
+        print(delta, end="", flush=True)
+
+    print("bot> ", end="", flush=True)
+    result = handle_message_stream(db=db, phone=CLI_TS_PHONE, text=user_input, on_delta=on_delta)
+    print()
+    if result.echo_text != "".join(streamed):
+        print(f"sms> {result.echo_text}")
+    print()
+
+
+def chat_tsn(stream: bool = False) -> None:
     """
     Interactive CLI chat assuming Tswana input.
 
     Uses the full pipeline (translate tsn->en, LLM, translate en->tsn)
     and logs to the database with a fixed pseudo-phone number.
+
+    With `stream=True` the answer is printed as Gemini generates it; if the
+    final SMS text differs (warnings, clamping) it is printed afterwards.
     """
     db = SessionLocal()
     print("Tswana CLI mode (via full pipeline). Type /quit to exit.\n")
@@ -26,14 +50,58 @@ def chat_tsn() -> None:
                 continue
             if user_input.lower() in {"/q", "/quit", "/exit"}:
                 break
-            result = handle_message(db=db, phone=CLI_TS_PHONE, text=user_input)
-            print(f"bot> {result.echo_text}\n")
+            if not stream:
+                result = handle_message(db=db, phone=CLI_TS_PHONE, text=user_input)
+                print(f"bot> {result.echo_text}\n")
+                continue
+
+            _stream_turn(db, user_input)
     finally:
         db.close()
 
 
+def chat_tsn_batch(lines: list[str]) -> None:
+    """
+    Non-interactive variant of chat_tsn.
+
+    Sends all non-empty lines through the pipeline as one batch, so the agent
+    calls overlap instead of paying a full round-trip each, then prints the
+    answers in input order.
+    """
+    texts = [line.strip() for line in lines if line.strip()]
+    if not texts:
+        return
+
+    db = SessionLocal()
+    try:
+        results = handle_messages(db=db, phone=CLI_TS_PHONE, texts=texts)
+    finally:
+        db.close()
+
+    for text, result in zip(texts, results, strict=True):
+        print(f"tsn> {text}")
+        print(f"bot> {result.echo_text}\n")
+
+
 def main() -> None:
-    chat_tsn()
+    parser = argparse.ArgumentParser(description="Chat with the sms-ai pipeline.")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read messages from stdin (one per line) until EOF and answer them as a batch.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print answers as they are generated (interactive mode only).",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    if args.batch:
+        chat_tsn_batch(sys.stdin.read().splitlines())
+    else:
+        chat_tsn(stream=args.stream)
 
 
 if __name__ == "__main__":
@@ -4,36 +4,44 @@ import os
 from functools import lru_cache
 from pathlib import Path
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Repo root in local dev (src/sms_ai/config.py -> parents[2]), /app in Docker.
+# Resolved once at import instead of once per field default.
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _default_database_url() -> str:
+    return os.getenv("DATABASE_URL", f"sqlite:///{_PROJECT_ROOT / 'sms_ai.db'}")
+
+
+def _default_glossary_csv() -> Path:
+    env_path = os.getenv("GLOSSARY_CSV_PATH")
+    if env_path:
+        return Path(env_path)
+    return _PROJECT_ROOT / "data" / "glossary.csv"
 
 
 class Settings(BaseModel):
+    # Environment variables are read when Settings() is built (see get_settings),
+    # not at import time.
+
     # Project root (repo root in local dev, /app in Docker)
-    project_root: Path = Path(__file__).resolve().parents[2]
+    project_root: Path = _PROJECT_ROOT
 
     # Database URL:
     # - Default for local dev: sqlite file in the project root (sms_ai.db)
     # - Override in Docker / production using the DATABASE_URL env var
-    database_url: str = os.getenv(
-        "DATABASE_URL",
-        f"sqlite:///{(Path(__file__).resolve().parents[2] / 'sms_ai.db')}",
-    )
+    database_url: str = Field(default_factory=_default_database_url)
 
-    # Optional glossary CSV path (can be overridden by env var)
-    # If None, we default to data/glossary.csv under project root.
-    glossary_csv: Path | None = None
+    # Optional glossary CSV path (can be overridden by the GLOSSARY_CSV_PATH env var).
+    # Defaults to data/glossary.csv under project root.
+    glossary_csv: Path | None = Field(default_factory=_default_glossary_csv)
 
     # --- Twilio settings for async outbound SMS ---
-    twilio_account_sid: str | None = os.getenv("TWILIO_ACCOUNT_SID")
-    twilio_auth_token: str | None = os.getenv("TWILIO_AUTH_TOKEN")
-    twilio_from_number: str | None = os.getenv("TWILIO_FROM_NUMBER")
-
-    def model_post_init(self, __context: object) -> None:  # type: ignore[override]
-        env_path = os.getenv("GLOSSARY_CSV_PATH")
-        if env_path:
-            object.__setattr__(self, "glossary_csv", Path(env_path))
-        elif self.glossary_csv is None:
-            object.__setattr__(self, "glossary_csv", self.project_root / "data" / "glossary.csv")
+    twilio_account_sid: str | None = Field(default_factory=lambda: os.getenv("TWILIO_ACCOUNT_SID"))
+    twilio_auth_token: str | None = Field(default_factory=lambda: os.getenv("TWILIO_AUTH_TOKEN"))
+    twilio_from_number: str | None = Field(default_factory=lambda: os.getenv("TWILIO_FROM_NUMBER"))
 
 
 @lru_cache
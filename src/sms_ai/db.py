@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
+from typing import Any
 
 from sqlalchemy import (
     DateTime,
+    Index,
     Integer,
     String,
     Text,
     create_engine,
+    event,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
 
@@ -24,6 +27,8 @@ class Base(DeclarativeBase):
 
 class Message(Base):
     __tablename__ = "messages"
+    # Per-phone history lookups: range scan instead of a full table scan.
+    __table_args__ = (Index("ix_messages_phone_created", "phone", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     phone: Mapped[str] = mapped_column(String, nullable=False)
@@ -36,6 +41,11 @@ class Message(Base):
 
 class Turn(Base):
     __tablename__ = "turns"
+    __table_args__ = (
+        Index("ix_turns_phone_created", "phone", "created_at"),
+        # /admin/turns: ORDER BY created_at DESC LIMIT n walks this index backwards.
+        Index("ix_turns_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     phone: Mapped[str] = mapped_column(String, nullable=False)
@@ -55,18 +65,65 @@ class Turn(Base):
     )
 
 
+class ResponseCache(Base):
+    """Agent responses keyed by a hash of the normalised user text."""
+
+    __tablename__ = "response_cache"
+
+    prompt_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    response_json: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
 # --- Engine & Session factory ---
 
 settings = get_settings()
 
+_is_sqlite = settings.database_url.startswith("sqlite")
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+    # timeout: wait for a competing writer instead of failing with "database is locked".
+    connect_args={"check_same_thread": False, "timeout": 30} if _is_sqlite else {},
+)
+
+# SQLite tuning, applied to every new connection:
+# - WAL lets readers run alongside the writer and avoids a rollback-journal
+#   fsync per commit; synchronous=NORMAL is durable enough in WAL mode.
+# - Temp tables, page cache (~20 MB) and mmap reads stay in memory.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
 )
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+if _is_sqlite:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in _SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# expire_on_commit=False: sessions here are short-lived and objects are only
+# read after their own commit (ids, text), so reloading every attribute with a
+# fresh SELECT after each commit buys nothing.
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 
 def init_db() -> None:
-    """Create tables if they don't exist."""
+    """Create tables and indexes if they don't exist."""
     Base.metadata.create_all(bind=engine)
+    # create_all() skips tables that already exist, including their indexes,
+    # so add any index introduced after the database was first created.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
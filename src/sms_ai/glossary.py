@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import csv
+import pickle
 import re
+import sys
 import unicodedata
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -14,17 +16,19 @@ from .config import get_settings
 LangCode = Literal["en", "tsn"]
 
 try:
-    from rapidfuzz import fuzz
+    from rapidfuzz import fuzz, process
 except ImportError:
     # Type checker complains because fuzz is expected to be a module, but we set it to None
     # when RapidFuzz is not available. This is intentional for graceful degradation.
     fuzz = None  # type: ignore[assignment]
+    process = None  # type: ignore[assignment]
 
 
 WORD_RE = re.compile(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñʼ'\-]+", re.UNICODE)
 
 
-@dataclass(frozen=True)
+# slots: no per-instance __dict__, which matters with thousands of entries.
+@dataclass(frozen=True, slots=True)
 class GlossaryEntry:
     english_label: str
     english_pos: str | None
@@ -45,41 +49,59 @@ class GlossaryEntry:
 @dataclass(frozen=True)
 class GlossaryIndex:
     entries: tuple[GlossaryEntry, ...]
-    # normalised form -> entries that contain this form
-    tsn_index: dict[str, list[GlossaryEntry]]
-    en_index: dict[str, list[GlossaryEntry]]
+    # normalised form -> ids (positions in `entries`) of entries that contain this form
+    tsn_index: dict[str, tuple[int, ...]]
+    en_index: dict[str, tuple[int, ...]]
     # for fuzzy matching
     tsn_forms: tuple[str, ...]
     en_forms: tuple[str, ...]
 
 
-def _normalise(text: str) -> str:
+def normalise_text(text: str) -> str:
     """Lowercase, strip accents, trim spaces."""
     text = text.strip().lower()
     text = unicodedata.normalize("NFKD", text)
     return "".join(ch for ch in text if not unicodedata.combining(ch))
 
 
-def _tokenise(text: str) -> list[str]:
-    return [_normalise(m.group(0)) for m in WORD_RE.finditer(text)]
+@lru_cache(maxsize=8192)
+def _normalise(text: str) -> str:
+    """
+    Cached normalise_text for glossary tokens and forms, which repeat a lot.
+
+    Whole messages should use normalise_text directly so they don't evict
+    the short tokens this cache is for.
+    """
+    return normalise_text(text)
+
+
+@lru_cache(maxsize=256)
+def _tokenise(text: str) -> tuple[str, ...]:
+    # Cached per message: the same text is often looked up more than once.
+    # findall() builds the token list in C without allocating Match objects.
+    return tuple(_normalise(token) for token in WORD_RE.findall(text))
 
 
 def _build_index(entries: list[GlossaryEntry]) -> GlossaryIndex:
-    tsn_index: dict[str, list[GlossaryEntry]] = {}
-    en_index: dict[str, list[GlossaryEntry]] = {}
+    # dict-as-ordered-set so an entry listing the same form twice gets one id
+    tsn_ids: dict[str, dict[int, None]] = {}
+    en_ids: dict[str, dict[int, None]] = {}
 
-    for entry in entries:
+    for entry_id, entry in enumerate(entries):
         for form in entry.all_setswana_forms:
             key = _normalise(form)
             if not key:
                 continue
-            tsn_index.setdefault(key, []).append(entry)
+            tsn_ids.setdefault(key, {})[entry_id] = None
 
         for form in entry.all_english_forms:
             key = _normalise(form)
             if not key:
                 continue
-            en_index.setdefault(key, []).append(entry)
+            en_ids.setdefault(key, {})[entry_id] = None
+
+    tsn_index = {form: tuple(ids) for form, ids in tsn_ids.items()}
+    en_index = {form: tuple(ids) for form, ids in en_ids.items()}
 
     return GlossaryIndex(
         entries=tuple(entries),
@@ -90,8 +112,63 @@ def _build_index(entries: list[GlossaryEntry]) -> GlossaryIndex:
     )
 
 
+_GLOSSARY_COLUMNS = (
+    "english_label",
+    "english_pos",
+    "setswana_preferred",
+    "setswana_variants",
+    "setswana_pos",
+)
+
+
+# Bump when GlossaryEntry / GlossaryIndex change shape, to invalidate old snapshots.
+_INDEX_SNAPSHOT_VERSION = 1
+
+
+def _snapshot_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + ".index.pickle")
+
+
+def _snapshot_key(csv_path: Path) -> tuple[int, int, int]:
+    stat = csv_path.stat()
+    return (_INDEX_SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def _load_index_snapshot(csv_path: Path) -> GlossaryIndex | None:
+    """Return the pickled index for `csv_path` if it matches the current CSV."""
+    try:
+        with _snapshot_path(csv_path).open("rb") as f:
+            key, index = pickle.load(f)
+    except Exception:
+        # Missing, truncated, foreign or stale (e.g. renamed classes): any
+        # unusable snapshot just means parsing the CSV again.
+        return None
+    if key != _snapshot_key(csv_path) or not isinstance(index, GlossaryIndex):
+        return None
+    return index
+
+
+def _save_index_snapshot(csv_path: Path, index: GlossaryIndex) -> None:
+    """Best effort: the data dir may be read-only (e.g. a mounted volume)."""
+    path = _snapshot_path(csv_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            pickle.dump((_snapshot_key(csv_path), index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
 @lru_cache
 def get_glossary_index() -> GlossaryIndex:
+    """
+    Load the glossary index.
+
+    The parsed index is also pickled next to the CSV (keyed by the CSV's
+    mtime and size), so short-lived processes such as the debug CLI skip
+    re-parsing the CSV on start-up.
+    """
     settings = get_settings()
     csv_path = settings.glossary_csv
 
@@ -99,23 +176,32 @@ def get_glossary_index() -> GlossaryIndex:
     if not csv_path or not Path(csv_path).is_file():
         return _build_index([])
 
+    csv_path = Path(csv_path)
+    snapshot = _load_index_snapshot(csv_path)
+    if snapshot is not None:
+        return snapshot
+
     entries: list[GlossaryEntry] = []
 
     with Path(csv_path).open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            english_label = (row.get("english_label") or "").strip()
-            if not english_label:
-                continue
+        # Plain csv.reader with column positions resolved once from the header,
+        # rather than DictReader building a dict for every row.
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        positions = {name.strip(): i for i, name in enumerate(header)}
+        columns = [positions.get(name) for name in _GLOSSARY_COLUMNS]
 
-            english_pos = (row.get("english_pos") or "").strip() or None
-            setswana_preferred = (row.get("setswana_preferred") or "").strip()
-            if not setswana_preferred:
+        for row in reader:
+            english_label, english_pos_raw, setswana_preferred, variants_raw, setswana_pos_raw = (
+                row[i].strip() if i is not None and i < len(row) else "" for i in columns
+            )
+            if not english_label or not setswana_preferred:
                 continue
 
-            setswana_pos = (row.get("setswana_pos") or "").strip() or None
+            # POS tags repeat across thousands of rows; intern them so they share one object.
+            english_pos = sys.intern(english_pos_raw) if english_pos_raw else None
+            setswana_pos = sys.intern(setswana_pos_raw) if setswana_pos_raw else None
 
-            variants_raw = (row.get("setswana_variants") or "").strip()
             if variants_raw:
                 variants = tuple(v.strip() for v in variants_raw.split("|") if v.strip())
             else:
@@ -131,18 +217,18 @@ def get_glossary_index() -> GlossaryIndex:
                 )
             )
 
-    return _build_index(entries)
+    index = _build_index(entries)
+    _save_index_snapshot(csv_path, index)
+    return index
 
 
 def _unique(entries: Iterable[GlossaryEntry]) -> list[GlossaryEntry]:
-    seen: set[tuple[str, str]] = set()
-    out: list[GlossaryEntry] = []
+    # One insertion-ordered dict instead of a seen-set plus an output list.
+    # setdefault keeps the first entry per key (a dict comprehension would keep the last).
+    unique: dict[tuple[str, str], GlossaryEntry] = {}
     for e in entries:
-        key = (e.english_label, e.setswana_preferred)
-        if key not in seen:
-            seen.add(key)
-            out.append(e)
-    return out
+        unique.setdefault((e.english_label, e.setswana_preferred), e)
+    return list(unique.values())
 
 
 def _score(a: str, b: str) -> float:
@@ -155,9 +241,35 @@ def _score(a: str, b: str) -> float:
     return 100.0 if a == b else 0.0
 
 
+def _best_forms(token: str, all_forms: tuple[str, ...], min_score: float) -> list[str]:
+    """Return the forms tied for the best score >= min_score for a single token."""
+    if process is not None and fuzz is not None:
+        # One C-level scan over all forms; results come back sorted by score.
+        scored = process.extract(
+            token, all_forms, scorer=fuzz.ratio, score_cutoff=min_score, limit=None
+        )
+        if not scored:
+            return []
+        best_score = scored[0][1]
+        return [form for form, s, _ in scored if s == best_score]
+
+    best_score = 0.0
+    best_forms: list[str] = []
+    for form in all_forms:
+        s = _score(token, form)
+        if s >= min_score:
+            if s > best_score:
+                best_score = s
+                best_forms = [form]
+            elif s == best_score:
+                best_forms.append(form)
+    return best_forms
+
+
 def _match_tokens(
-    tokens: list[str],
-    index_map: dict[str, list[GlossaryEntry]],
+    tokens: Sequence[str],
+    entries: tuple[GlossaryEntry, ...],
+    index_map: dict[str, tuple[int, ...]],
     all_forms: tuple[str, ...],
     *,
     max_terms: int = 30,
@@ -172,36 +284,27 @@ def _match_tokens(
     if not tokens:
         return []
 
-    matches: list[GlossaryEntry] = []
+    # Repeated words ("peas peas", "go ... go") would only produce the same
+    # matches again, so look each distinct token up once, in first-seen order.
+    unique_tokens = list(dict.fromkeys(tokens))
+
+    # Matched entry ids, in first-seen order (dict used as an ordered set).
+    matched_ids: dict[int, None] = {}
 
     # Exact matches
-    for token in tokens:
+    for token in unique_tokens:
         if token in index_map:
-            matches.extend(index_map[token])
+            matched_ids.update(dict.fromkeys(index_map[token]))
 
     # Fuzzy matches (only if RapidFuzz available OR you want difflib fallback)
-    remaining_tokens = [t for t in tokens if t not in index_map]
+    remaining_tokens = [t for t in unique_tokens if t not in index_map]
     if remaining_tokens and all_forms:
-        # If RapidFuzz is available, score against all_forms
         for token in remaining_tokens:
-            best_score = 0.0
-            best_forms: list[str] = []
-
-            for form in all_forms:
-                s = _score(token, form)
-                if s >= min_score:
-                    if s > best_score:
-                        best_score = s
-                        best_forms = [form]
-                    elif s == best_score:
-                        best_forms.append(form)
-
-            if best_forms and best_score >= min_score:
-                for form in best_forms:
-                    matches.extend(index_map.get(form, []))
+            for form in _best_forms(token, all_forms, min_score):
+                matched_ids.update(dict.fromkeys(index_map.get(form, ())))
 
-    # Deduplicate and limit
-    return _unique(matches)[:max_terms]
+    # Deduplicate (duplicate CSV rows share a label pair) and limit
+    return _unique(entries[i] for i in matched_ids)[:max_terms]
 
 
 def _entries_for_token(
@@ -228,6 +331,7 @@ def _entries_for_token(
     # Use a very high max_terms so we effectively don't limit per token
     return _match_tokens(
         tokens=[token],
+        entries=idx.entries,
         index_map=index_map,
         all_forms=all_forms,
         max_terms=999,
@@ -238,14 +342,14 @@ def find_terms_for_tsn(text: str, max_terms: int = 30) -> list[GlossaryEntry]:
     """Find relevant glossary entries for Setswana source text."""
     idx = get_glossary_index()
     tokens = _tokenise(text)
-    return _match_tokens(tokens, idx.tsn_index, idx.tsn_forms, max_terms=max_terms)
+    return _match_tokens(tokens, idx.entries, idx.tsn_index, idx.tsn_forms, max_terms=max_terms)
 
 
 def find_terms_for_en(text: str, max_terms: int = 30) -> list[GlossaryEntry]:
     """Find relevant glossary entries for English source text."""
     idx = get_glossary_index()
     tokens = _tokenise(text)
-    return _match_tokens(tokens, idx.en_index, idx.en_forms, max_terms=max_terms)
+    return _match_tokens(tokens, idx.entries, idx.en_index, idx.en_forms, max_terms=max_terms)
 
 
 def preview_matches_for_text(
@@ -273,7 +377,36 @@ def preview_matches_for_text(
 
     Only tokens that have at least one glossary match are included.
     """
-    results: list[dict[str, object]] = []
+    return [
+        {
+            "token": raw_token,
+            "normalised_token": normalised,
+            "entries": [
+                {
+                    "english_label": e.english_label,
+                    "english_pos": e.english_pos,
+                    "setswana_preferred": e.setswana_preferred,
+                    "setswana_variants": list(e.setswana_variants),
+                    "setswana_pos": e.setswana_pos,
+                }
+                for e in entries
+            ],
+        }
+        for raw_token, normalised, entries in _preview_matches_cached(text, source)
+    ]
+
+
+@lru_cache(maxsize=128)
+def _preview_matches_cached(
+    text: str,
+    source: LangCode,
+) -> tuple[tuple[str, str, tuple[GlossaryEntry, ...]], ...]:
+    """
+    Cached core of preview_matches_for_text: (token, normalised, entries) per
+    matching token. Immutable so the cached value can be shared safely; the
+    glossary index is loaded once per process, so results never go stale.
+    """
+    results: list[tuple[str, str, tuple[GlossaryEntry, ...]]] = []
 
     # Use WORD_RE directly so we can keep the original surface form,
     # then normalise it for lookup.
@@ -282,24 +415,7 @@ def preview_matches_for_text(
         normalised = _normalise(raw_token)
 
         entries = _entries_for_token(normalised, source=source)
-        if not entries:
-            continue
-
-        results.append(
-            {
-                "token": raw_token,
-                "normalised_token": normalised,
-                "entries": [
-                    {
-                        "english_label": e.english_label,
-                        "english_pos": e.english_pos,
-                        "setswana_preferred": e.setswana_preferred,
-                        "setswana_variants": list(e.setswana_variants),
-                        "setswana_pos": e.setswana_pos,
-                    }
-                    for e in entries
-                ],
-            }
-        )
+        if entries:
+            results.append((raw_token, normalised, tuple(entries)))
 
-    return results
+    return tuple(results)
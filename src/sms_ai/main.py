@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
+import logging
 import os
 from collections.abc import Generator
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import Final
 
+import httpx
+import orjson
 from fastapi import BackgroundTasks, Depends, FastAPI, Form, HTTPException, Request, Response
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .db import Message, SessionLocal, Turn, init_db
-from .pipeline import handle_message, process_existing_incoming_message
-from .sms import InboundSms
-from .twilio_client import send_sms
+from .pipeline import (
+    PreparedReply,
+    aanswer_message,
+    aprepare_reply,
+    is_carrier_keyword,
+    save_reply,
+)
+from .sms import MAX_INBOUND_SMS_CHARS, MAX_PHONE_CHARS, InboundSms
+from .twilio_client import aclose_twilio_async_client, asend_sms, is_opted_out
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -20,7 +37,8 @@ async def lifespan(app: FastAPI):
     # Startup: runs once before the app starts serving requests
     init_db()
     yield
-    # Shutdown: runs once when the app is shutting down (nothing to do yet)
+    # Shutdown: runs once when the app is shutting down
+    await aclose_twilio_async_client()
 
 
 app = FastAPI(title="sms.ai", version="0.1.0", lifespan=lifespan)
@@ -31,9 +49,19 @@ app = FastAPI(title="sms.ai", version="0.1.0", lifespan=lifespan)
 BASE_DIR = Path(os.getenv("PROJECT_ROOT", Path(__file__).resolve().parents[2]))
 DEMO_HTML_PATH = BASE_DIR / "static" / "demo.html"
 
+
+@lru_cache
+def _demo_html() -> tuple[bytes, str]:
+    """The demo page and its ETag, read from disk once per process."""
+    content = DEMO_HTML_PATH.read_bytes()
+    return content, '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+
 # --- Admin protection ---
 
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Encoded once; compared against the header with hmac.compare_digest.
+_ADMIN_TOKEN_BYTES = ADMIN_TOKEN.encode("utf-8") if ADMIN_TOKEN else None
 ALLOWED_ADMIN_IPS = {"127.0.0.1", "::1"}
 
 
@@ -48,12 +76,14 @@ def verify_admin(request: Request) -> None:
     if client_host not in ALLOWED_ADMIN_IPS:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    if not ADMIN_TOKEN:
+    if not _ADMIN_TOKEN_BYTES:
         # Misconfiguration; safer to refuse access than to expose data.
         raise HTTPException(status_code=500, detail="ADMIN_TOKEN not configured")
 
-    header_token = request.headers.get("X-Admin-Token")
-    if header_token != ADMIN_TOKEN:
+    # Constant-time compare, so response timing doesn't leak how much of a
+    # guessed token was right.
+    header_token = request.headers.get("X-Admin-Token", "").encode("utf-8")
+    if not hmac.compare_digest(header_token, _ADMIN_TOKEN_BYTES):
         raise HTTPException(status_code=401, detail="Invalid admin token")
 
 
@@ -70,33 +100,60 @@ def get_db() -> Generator[Session, None, None]:
 
 # --- Routes ---
 
+# Reply body for /sms/inbound: the answer is sent later via the REST API, so the
+# webhook response is always this same empty document.
+EMPTY_TWIML: Final[bytes] = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response></Response>"""
+
+
+def _load_message(message_id: int) -> Message | None:
+    """Load a Message by id; the returned object is detached but fully loaded."""
+    db = SessionLocal()
+    try:
+        return db.get(Message, message_id)
+    finally:
+        db.close()
+
 
-def process_and_reply_async(message_id: int, to_number: str) -> None:
+async def process_and_reply_async(message_id: int, to_number: str) -> None:
     """
     Background task:
 
-    - open a fresh DB session
     - load the existing incoming Message by id
-    - run the pipeline
-    - send the SMS via Twilio REST API
+    - run the agent and build the reply
+    - store the reply and its Turn
+    - send the SMS via Twilio REST API, except for STOP/START/HELP keywords:
+      Twilio's opt-out handling has already answered those (and blocks
+      sends after STOP), so their turn is only recorded
+
+    Runs on the event loop rather than in Starlette's threadpool: the agent
+    is awaited, so a burst of inbound SMS does not queue behind a fixed number
+    of worker threads while Gemini is thinking. The blocking DB work runs in
+    worker threads, each on its own short-lived session, so no pooled
+    connection is held while Gemini is thinking and a busy database never
+    stalls the loop.
     """
-    db = SessionLocal()
-    try:
-        incoming = db.query(Message).filter(Message.id == message_id).first()
-        if incoming is None:
-            # Nothing to do (message missing)
-            return
+    incoming = await asyncio.to_thread(_load_message, message_id)
+    if incoming is None:
+        # Nothing to do (message missing)
+        return
 
-        result = process_existing_incoming_message(db=db, incoming=incoming)
-    finally:
-        db.close()
+    reply = await aprepare_reply(incoming)
+    await asyncio.to_thread(save_reply_in_background, reply)
 
-    # send the SMS after we've closed the DB session
-    send_sms(to=to_number, body=result.echo_text)
+    if is_carrier_keyword(incoming.text):
+        return
+
+    try:
+        await asend_sms(to=to_number, body=reply.outgoing.text)
+    except httpx.HTTPStatusError as exc:
+        if not is_opted_out(exc):
+            raise
+        logger.info("Not replying to message %s: sender has opted out", message_id)
 
 
 @app.get("/")
-def demo_page() -> FileResponse:
+def demo_page(request: Request) -> Response:
     """
     Web demo page that mimics the SMS UI.
 
@@ -104,12 +161,35 @@ def demo_page() -> FileResponse:
     - Uses a fake phone number stored in localStorage.
     - Sends JSON requests to /test/inbound.
     - Does NOT use Twilio or /sms/inbound.
+
+    Served from memory with an ETag; browsers revalidate ("no-cache") and get
+    a 304 while the page is unchanged, and see a new deploy immediately.
     """
-    return FileResponse(DEMO_HTML_PATH)
+    content, etag = _demo_html()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=content, media_type="text/html", headers=headers)
+
+
+def save_reply_in_background(reply: PreparedReply) -> None:
+    """Background task: store a reply and its Turn after the response went out."""
+    db = SessionLocal()
+    try:
+        save_reply(db, reply)
+    finally:
+        db.close()
 
 
 @app.post("/test/inbound")
-def test_inbound(payload: InboundSms, db: Session = Depends(get_db)) -> JSONResponse:
+async def test_inbound(
+    payload: InboundSms,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
     """
     Test endpoint for Milestone 1.
 
@@ -117,9 +197,11 @@ def test_inbound(payload: InboundSms, db: Session = Depends(get_db)) -> JSONResp
 
       { "phone": "+27123456789", "text": "Dumela" }
 
-    Stores the message and returns an echo.
+    Stores the message and returns an echo. The reply and Turn are logged
+    in a background task once the response has been sent.
     """
-    result = handle_message(db=db, phone=payload.phone, text=payload.text)
+    result, reply = await aanswer_message(db=db, phone=payload.phone, text=payload.text)
+    background_tasks.add_task(save_reply_in_background, reply)
     return JSONResponse(
         {
             "status": "ok",
@@ -132,8 +214,8 @@ def test_inbound(payload: InboundSms, db: Session = Depends(get_db)) -> JSONResp
 @app.post("/sms/inbound")
 def sms_inbound(
     background_tasks: BackgroundTasks,
-    From_: str = Form(..., alias="From"),
-    Body: str = Form(..., alias="Body"),
+    From_: str = Form(..., alias="From", max_length=MAX_PHONE_CHARS),
+    Body: str = Form(..., alias="Body", max_length=MAX_INBOUND_SMS_CHARS),
     db: Session = Depends(get_db),
 ) -> Response:
     """
@@ -150,17 +232,32 @@ def sms_inbound(
     # Store incoming message
     incoming = Message(phone=from_number, direction="in", text=body)
     db.add(incoming)
+    # The id is set from lastrowid at flush, and sessions don't expire on
+    # commit, so reading it afterwards needs no extra SELECT.
     db.commit()
-    db.refresh(incoming)
 
     # Schedule async processing + SMS send
     background_tasks.add_task(process_and_reply_async, incoming.id, from_number)
 
     # 3. Return empty TwiML so Twilio is satisfied but sends no immediate SMS
-    twiml = """<?xml version="1.0" encoding="UTF-8"?>
-<Response></Response>"""
-
-    return Response(content=twiml, media_type="application/xml")
+    return Response(content=EMPTY_TWIML, media_type="application/xml")
+
+
+# Columns returned by /admin/turns, selected directly so no ORM objects are built.
+_ADMIN_TURN_COLUMNS = (
+    Turn.id,
+    Turn.phone,
+    Turn.created_at,
+    Turn.lang_detected,
+    Turn.question_tsn_raw,
+    Turn.question_en,
+    Turn.answer_en,
+    Turn.answer_tsn,
+    Turn.llm_model,
+    Turn.translation_backend,
+    Turn.reasoning_summary,
+    Turn.safety_flags_json,
+)
 
 
 @app.get("/admin/turns")
@@ -168,7 +265,7 @@ def admin_turns(
     limit: int = 50,
     db: Session = Depends(get_db),
     _: None = Depends(verify_admin),
-) -> JSONResponse:
+) -> Response:
     """
     Very small admin endpoint to inspect recent turns.
 
@@ -178,23 +275,10 @@ def admin_turns(
     """
     # Clamp limit to a reasonable range
     safe_limit = max(1, min(limit, 200))
-    turns = db.query(Turn).order_by(Turn.created_at.desc()).limit(safe_limit).all()
+    rows = db.execute(
+        select(*_ADMIN_TURN_COLUMNS).order_by(Turn.created_at.desc()).limit(safe_limit)
+    ).mappings()
 
-    payload = [
-        {
-            "id": t.id,
-            "phone": t.phone,
-            "created_at": t.created_at,
-            "lang_detected": t.lang_detected,
-            "question_tsn_raw": t.question_tsn_raw,
-            "question_en": t.question_en,
-            "answer_en": t.answer_en,
-            "answer_tsn": t.answer_tsn,
-            "llm_model": t.llm_model,
-            "translation_backend": t.translation_backend,
-            "reasoning_summary": t.reasoning_summary,
-            "safety_flags_json": t.safety_flags_json,
-        }
-        for t in turns
-    ]
-    return JSONResponse(payload)
+    # orjson serialises created_at (a datetime) natively as ISO 8601.
+    payload = [dict(row) for row in rows]
+    return Response(content=orjson.dumps(payload), media_type="application/json")
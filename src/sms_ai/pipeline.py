@@ -1,17 +1,165 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import re
-from collections.abc import Mapping
+import unicodedata
+from collections.abc import Callable, Generator, Mapping, Sequence
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Final
 
+import orjson
 from sqlalchemy.orm import Session
 
-from .agent import run_agent
+from .agent import (
+    AGENT_MODEL_NAME,
+    AgentResponse,
+    arun_agent,
+    run_agent,
+    run_agent_batch,
+    run_agent_stream,
+)
 from .db import Message, Turn
 
-MAX_SMS_CHARS: Final[int] = 320
+# Replies are clamped to this many SMS segments. A multi-part segment carries
+# 153 GSM-7 septets, or 67 UTF-16 code units once any character forces UCS-2.
+MAX_SMS_SEGMENTS: Final[int] = 2
+_GSM7_SEGMENT_SEPTETS: Final[int] = 153
+_UCS2_SEGMENT_UNITS: Final[int] = 67
+
+# Septet cost of each character in the GSM 03.38 alphabet; extension-table
+# characters are sent as ESC + char. Anything else makes the whole SMS UCS-2.
+_GSM7_BASIC: Final[frozenset[str]] = frozenset(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+_GSM7_EXTENSION: Final[frozenset[str]] = frozenset("\f^{}\\[~]|€")
+_GSM7_COST: Final[dict[str, int]] = {
+    **dict.fromkeys(_GSM7_BASIC, 1),
+    **dict.fromkeys(_GSM7_EXTENSION, 2),
+}
+
+
+def _gsm7_lookalikes() -> dict[int, str]:
+    """
+    Translation table from common non-GSM characters to GSM-7 look-alikes.
+
+    Covers typographic punctuation the model likes to emit, and accented
+    Latin letters folded to their base letter (Setswana ê, ô, š -> e, o, s),
+    so a single such character doesn't push the whole reply into UCS-2.
+    """
+    table = {
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u02bc": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2013": "-",
+        "\u2014": "-",
+        "\u2026": "...",
+        "\u00a0": " ",
+    }
+    # Latin-1 Supplement, Latin Extended-A/B and Latin Extended Additional.
+    for cp in (*range(0x00C0, 0x0250), *range(0x1E00, 0x1F00)):
+        ch = chr(cp)
+        if ch in _GSM7_COST or ch in table:
+            continue
+        base = "".join(c for c in unicodedata.normalize("NFD", ch) if not unicodedata.combining(c))
+        if base and all(c in _GSM7_COST for c in base):
+            table[ch] = base
+    return str.maketrans(table)
+
+
+_GSM7_LOOKALIKES: Final[dict[int, str]] = _gsm7_lookalikes()
+
+# Continuation hint appended to clamped replies. Plain ASCII, so it costs one
+# septet or one code unit per character in either encoding.
+_CLAMP_TAIL: Final[str] = " Karabo e khutshwane; o ka botsa gape gore re tlhalose."
+# Used instead when the reply has to go out as UCS-2: the full hint would take
+# 41% of the 134-unit budget.
+_CLAMP_TAIL_UCS2: Final[str] = " ..."
+
+# Appended by maybe_add_warning when the agent asks for human review.
+_WARNING_TSN: Final[str] = (
+    " Tlhokomeliso: maemo a a ka nna a le masisi. "
+    "Bua le ofisiri ya temo kgotsa molemi yo o nang le maitemogelo."
+)
+
+AGENT_BACKEND: Final[str] = "gemini3:tavily-single-call"
+# Turns answered without the agent (see needs_agent).
+PASSTHROUGH_BACKEND: Final[str] = "passthrough"
+
+# Any letter, in any script.
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+# Reply to messages with nothing to answer, in Setswana and English since the
+# language can't be told from digits and symbols.
+NO_QUESTION_REPLY: Final[str] = (
+    "Dumela! Re kwalele potso ya gago ka ga temo. Hello! Please send us your farming question."
+)
+
+STOP_REPLY: Final[str] = (
+    "Ga re kitla re go romelela melaetsa gape. Romela START go simolola gape. "
+    "You will not get more messages from us. Send START to start again."
+)
+
+HELP_REPLY: Final[str] = (
+    "sms.ai e araba dipotso tsa temo ka Setswana le Sekgoa. Romela potso ya gago. "
+    "sms.ai answers farming questions in Setswana and English. Send your question, "
+    "or STOP to opt out."
+)
+
+# Carrier compliance keywords, answered with a fixed reply instead of the
+# agent: keyword -> (intent, reply).
+_KEYWORD_REPLIES: Final[dict[str, tuple[str, str]]] = {
+    "stop": ("opt_out", STOP_REPLY),
+    "unsubscribe": ("opt_out", STOP_REPLY),
+    "start": ("opt_in", NO_QUESTION_REPLY),
+    "help": ("help", HELP_REPLY),
+    "info": ("help", HELP_REPLY),
+}
+
+
+def _keyword(text: str) -> str:
+    """The message folded for lookup in _KEYWORD_REPLIES ("Stop!" -> "stop")."""
+    return unicodedata.normalize("NFKC", text).strip(" \t\r\n.!").casefold()
+
+
+def is_carrier_keyword(text: str) -> bool:
+    """True if the message is just a STOP/START/HELP-style keyword."""
+    return _keyword(text) in _KEYWORD_REPLIES
+
+
+def needs_agent(text: str) -> bool:
+    """
+    False for messages with no letters at all (numbers, "?", emoji, empty)
+    and for the STOP/START/HELP keywords.
+
+    There is nothing to translate or answer in those, so the pipeline replies
+    with a canned reply instead of spending a Gemini call on them.
+    """
+    return _LETTER_RE.search(text) is not None and not is_carrier_keyword(text)
+
+
+def _canned_response(text: str) -> AgentResponse:
+    keyword = _keyword(text)
+    if keyword in _KEYWORD_REPLIES:
+        intent, reply = _KEYWORD_REPLIES[keyword]
+        reasoning_summary = f"{keyword.upper()} keyword; agent not called."
+    else:
+        intent, reply = "no_question", NO_QUESTION_REPLY
+        reasoning_summary = "No letters in the message; agent not called."
+    return {
+        "detected_language": "other",
+        "source_text": text,
+        "english_translation": text,
+        "intent": intent,
+        "answer_english": reply,
+        "final_answer_user_language": reply,
+        "safety_flags": {"mentions_dosage": False, "needs_human_review": False},
+        "reasoning_summary": reasoning_summary,
+    }
 
 
 def normalise_sms_text(text: str) -> str:
@@ -21,6 +169,8 @@ def normalise_sms_text(text: str) -> str:
     - Strip very simple markdown like **bold** and __bold__.
     - Remove leading bullet markers (-, *, •) at the start of lines.
     - Collapse all whitespace and line breaks to single spaces.
+    - Swap curly quotes, dashes, ellipses and accented letters for their
+      GSM-7 equivalents.
     """
     # Remove basic bold/underline markdown markers but keep the inner text.
     text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
@@ -37,44 +187,68 @@ def normalise_sms_text(text: str) -> str:
     # Join lines with spaces and collapse any remaining whitespace.
     text = " ".join(cleaned_lines)
     text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return unicodedata.normalize("NFC", text).translate(_GSM7_LOOKALIKES).strip()
+
 
+def _gsm7_prefix_len(text: str, septets: int) -> int:
+    """Length of the longest GSM-7-only prefix of `text` within `septets`."""
+    length = used = 0
+    for ch in text:
+        cost = _GSM7_COST.get(ch)
+        if cost is None or used + cost > septets:
+            break
+        used += cost
+        length += 1
+    return length
 
+
+def _ucs2_prefix_len(text: str, units: int) -> int:
+    """Length of the longest prefix of `text` within `units` UTF-16 code units."""
+    length = used = 0
+    for ch in text:
+        used += 2 if ord(ch) > 0xFFFF else 1
+        if used > units:
+            break
+        length += 1
+    return length
+
+
+@lru_cache(maxsize=1024)
 def clamp_sms(text: str) -> str:
     """
-    Ensure the SMS body is not excessively long.
+    Ensure the SMS body fits in MAX_SMS_SEGMENTS segments.
 
-    We aim for roughly <= 2 GSM-7 SMS segments (~160 chars each).
+    Length is counted the way carriers bill it: GSM-7 septets (extension
+    characters such as € cost two), or UTF-16 code units if the text needs
+    UCS-2. Run normalise_sms_text first so accented letters don't force UCS-2.
 
-    If it's longer, we try to cut at a sentence boundary and then add
-    a short continuation hint in Setswana.
+    If it's longer, we try to cut at a sentence (or else word) boundary and
+    then add a short continuation hint in Setswana.
     """
-    if len(text) <= MAX_SMS_CHARS:
+    septets = MAX_SMS_SEGMENTS * _GSM7_SEGMENT_SEPTETS
+    units = MAX_SMS_SEGMENTS * _UCS2_SEGMENT_UNITS
+    if _gsm7_prefix_len(text, septets) == len(text) or _ucs2_prefix_len(text, units) == len(text):
         return text
 
-    # Shorter Setswana tail to reduce noise in the SMS.
-    tail = " Karabo e khutshwane; o ka botsa gape gore re tlhalose."
-
-    # If the tail itself is longer than the budget, hard-cut the text.
-    if len(tail) >= MAX_SMS_CHARS:
-        return text[:MAX_SMS_CHARS].rstrip()
-
-    # Reserve space for the tail.
-    allowed = MAX_SMS_CHARS - len(tail)
-    base = text[:allowed].rstrip()
-
-    # Try to avoid truncating in the middle of a sentence:
-    # look for the last sentence-ending punctuation within `base`.
-    last_full_stop = base.rfind(".")
-    last_exclam = base.rfind("!")
-    last_question = base.rfind("?")
-    cut_idx = max(last_full_stop, last_exclam, last_question)
+    # Reserve space for the tail, in whichever encoding keeps more text.
+    gsm_len = _gsm7_prefix_len(text, septets - len(_CLAMP_TAIL))
+    ucs2_len = _ucs2_prefix_len(text, units - len(_CLAMP_TAIL_UCS2))
+    if gsm_len >= ucs2_len:
+        base, tail = text[:gsm_len], _CLAMP_TAIL
+    else:
+        base, tail = text[:ucs2_len], _CLAMP_TAIL_UCS2
 
-    if cut_idx != -1:
+    # Try to avoid truncating in the middle of a sentence: look for the last
+    # sentence-ending punctuation, unless that would drop over half the text.
+    cut_idx = max(base.rfind("."), base.rfind("!"), base.rfind("?"))
+    if cut_idx >= len(base) // 2:
         # Keep everything up to and including the punctuation mark.
-        base = base[: cut_idx + 1].rstrip()
+        base = base[: cut_idx + 1]
+    elif base.rfind(" ") > 0:
+        # No late sentence end: at least don't cut a word in half.
+        base = base[: base.rfind(" ")]
 
-    return base + tail
+    return base.rstrip() + tail
 
 
 def maybe_add_warning(answer_en: str, answer_tsn: str, safety_flags: Mapping[str, Any]) -> str:
@@ -88,38 +262,46 @@ def maybe_add_warning(answer_en: str, answer_tsn: str, safety_flags: Mapping[str
 
     needs_human_review = bool(safety_flags.get("needs_human_review"))
     if needs_human_review:
-        warning = (
-            " Tlhokomeliso: maemo a a ka nna a le masisi. "
-            "Bua le ofisiri ya temo kgotsa molemi yo o nang le maitemogelo."
-        )
         out = out.rstrip()
         if not out.endswith("."):
             out += "."
-        out += warning
+        out += _WARNING_TSN
 
     return out
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineResult:
     echo_text: str
     message_id: int
 
 
-def process_existing_incoming_message(db: Session, incoming: Message) -> PipelineResult:
+@dataclass(slots=True)
+class PreparedReply:
     """
-    Core pipeline logic assuming the incoming Message is already stored.
+    The reply to one incoming message, not yet written to the DB.
+
+    `outgoing` and `turn` are transient ORM objects; save_reply() inserts them
+    and fills in turn.outgoing_id.
+    """
+
+    outgoing: Message
+    turn: Turn
+
+
+def prepare_reply(incoming: Message, agent_result: AgentResponse | None) -> PreparedReply:
+    """
+    Turn an agent result into the SMS reply and its Turn record, without DB access.
 
-    Used by:
-      - synchronous HTTP endpoints (/test/inbound)
-      - async Twilio worker (background task)
-      - CLI, etc.
+    `agent_result` is None for messages that don't need the agent (see
+    needs_agent); they get a canned reply.
     """
     text = incoming.text
     phone = incoming.phone
 
-    # 2. Call the agent
-    agent_result = run_agent(text)
+    use_agent = agent_result is not None
+    if agent_result is None:
+        agent_result = _canned_response(text)
 
     detected_language = agent_result["detected_language"]
     english_translation = agent_result["english_translation"]
@@ -128,7 +310,7 @@ def process_existing_incoming_message(db: Session, incoming: Message) -> Pipelin
     safety_flags = agent_result.get("safety_flags", {})
     reasoning_summary = agent_result.get("reasoning_summary", "")
 
-    # 3. Decide what to store as question_tsn_raw / question_en / answer_tsn
+    # Decide what to store as question_tsn_raw / question_en / answer_tsn
     if detected_language in ("tsn", "mixed"):
         question_tsn_raw = text
         question_en = english_translation
@@ -142,7 +324,7 @@ def process_existing_incoming_message(db: Session, incoming: Message) -> Pipelin
         question_en = english_translation or text
         answer_tsn = None
 
-    # 4. Apply safety/UX hooks
+    # Apply safety/UX hooks
     if detected_language in ("tsn", "mixed"):
         answer_for_user = maybe_add_warning(
             answer_en=answer_en,
@@ -156,47 +338,207 @@ def process_existing_incoming_message(db: Session, incoming: Message) -> Pipelin
     # Clean up markdown / bullets / whitespace for SMS.
     answer_for_user = normalise_sms_text(answer_for_user)
 
-    # Then enforce the 320-char limit with a short Setswana tail.
+    # Then enforce the two-segment limit with a short Setswana tail.
     answer_for_user = clamp_sms(answer_for_user)
 
-    # 5. Save outgoing message
     outgoing = Message(phone=phone, direction="out", text=answer_for_user)
-    db.add(outgoing)
-    db.commit()
-    db.refresh(outgoing)
-
-    # 6. Save Turn with full sandwich as best we can
     turn = Turn(
         phone=phone,
         incoming_id=incoming.id,
-        outgoing_id=outgoing.id,
         lang_detected=detected_language,
         question_tsn_raw=question_tsn_raw,
         question_en=question_en,
         answer_en=answer_en,
         answer_tsn=answer_tsn,
-        llm_model="gemini-3-pro-preview",
-        translation_backend="gemini3:tavily-single-call",
+        llm_model=AGENT_MODEL_NAME if use_agent else None,
+        translation_backend=AGENT_BACKEND if use_agent else PASSTHROUGH_BACKEND,
         reasoning_summary=reasoning_summary,
-        safety_flags_json=json.dumps(safety_flags),
+        safety_flags_json=orjson.dumps(safety_flags).decode(),
     )
-    db.add(turn)
+    return PreparedReply(outgoing=outgoing, turn=turn)
+
+
+def save_replies(db: Session, replies: Sequence[PreparedReply]) -> None:
+    """
+    Insert outgoing Messages and their Turns in a single transaction.
+
+    Objects of one kind are flushed together, so where the backend supports
+    batched INSERT ... RETURNING (e.g. Postgres) each table gets one
+    statement; SQLite still inserts row by row but within one commit.
+    """
+    db.add_all([reply.outgoing for reply in replies])
+    # flush() assigns outgoing ids without committing, so the outgoing
+    # Messages and the Turns land in one commit.
+    db.flush()
+    for reply in replies:
+        reply.turn.outgoing_id = reply.outgoing.id
+    db.add_all([reply.turn for reply in replies])
     db.commit()
 
-    # 7. Return answer for endpoints / worker to send via SMS/HTTP
-    return PipelineResult(echo_text=answer_for_user, message_id=incoming.id)
 
+def save_reply(db: Session, reply: PreparedReply) -> None:
+    """Insert the outgoing Message and its Turn in a single transaction."""
+    save_replies(db, [reply])
 
-def handle_message(db: Session, phone: str, text: str) -> PipelineResult:
+
+def process_existing_incoming_message(
+    db: Session,
+    incoming: Message,
+    agent_result: AgentResponse | None = None,
+) -> PipelineResult:
     """
-    Wrapper used by synchronous callers.
+    Core pipeline logic assuming the incoming Message is already stored.
+
+    Used by handle_message and handle_message_stream (the chat CLI). The
+    HTTP endpoints don't call it: /test/inbound uses aanswer_message and the
+    Twilio worker aprepare_reply, both of which save the reply separately.
 
-    - stores the incoming message
-    - delegates to process_existing_incoming_message(...)
+    If `agent_result` is given (e.g. computed as part of a batch), the agent
+    call is skipped.
     """
+    # Call the agent (unless there is nothing to ask it)
+    if not needs_agent(incoming.text):
+        agent_result = None
+    elif agent_result is None:
+        agent_result = run_agent(incoming.text)
+
+    reply = prepare_reply(incoming, agent_result)
+    save_reply(db, reply)
+
+    # Return answer for endpoints / worker to send via SMS/HTTP
+    return PipelineResult(echo_text=reply.outgoing.text, message_id=incoming.id)
+
+
+async def aprepare_reply(incoming: Message) -> PreparedReply:
+    """
+    Async counterpart of process_existing_incoming_message for the Twilio
+    worker, minus the DB write.
+
+    Needs no session (`incoming` may be detached), so no pooled connection or
+    read transaction is held while the agent is awaited. The caller saves the
+    returned PreparedReply (save_reply) afterwards, off the event loop.
+    """
+    agent_result = await arun_agent(incoming.text) if needs_agent(incoming.text) else None
+    return prepare_reply(incoming, agent_result)
+
+
+def _store_incoming(db: Session, phone: str, text: str) -> Message:
     incoming = Message(phone=phone, direction="in", text=text)
     db.add(incoming)
+    db.flush()  # assigns incoming.id
+    return incoming
+
+
+def _commit_incoming(db: Session, phone: str, text: str) -> Message:
+    incoming = _store_incoming(db, phone, text)
     db.commit()
-    db.refresh(incoming)
+    return incoming
+
+
+@contextmanager
+def _keep_incoming_on_error(db: Session, phone: str, *texts: str) -> Generator[None, None, None]:
+    """If the agent call inside fails, still record the farmer's message(s)."""
+    try:
+        yield
+    except Exception:
+        db.add_all([Message(phone=phone, direction="in", text=text) for text in texts])
+        db.commit()
+        raise
+
+
+def handle_message(db: Session, phone: str, text: str) -> PipelineResult:
+    """
+    Wrapper used by synchronous callers.
+
+    - runs the agent
+    - stores the incoming message, reply and Turn in one transaction,
+      via process_existing_incoming_message(...)
+
+    The agent runs before anything is written, so no SQLite write
+    transaction stays open across the (multi-second) Gemini call and the
+    whole turn costs a single commit.
+    """
+    with _keep_incoming_on_error(db, phone, text):
+        agent_result = run_agent(text) if needs_agent(text) else None
+
+    incoming = _store_incoming(db, phone, text)
+    return process_existing_incoming_message(db=db, incoming=incoming, agent_result=agent_result)
+
 
-    return process_existing_incoming_message(db=db, incoming=incoming)
+async def aanswer_message(
+    db: Session, phone: str, text: str
+) -> tuple[PipelineResult, PreparedReply]:
+    """
+    Async counterpart of handle_message, for endpoints running on the event
+    loop, that leaves the reply unsaved.
+
+    The agent call is awaited, so concurrent requests interleave their
+    Gemini/Tavily waits instead of each holding a threadpool worker.
+
+    Only the incoming message is committed; the caller saves the returned
+    PreparedReply (save_reply) after it has responded, e.g. in a background
+    task, so that commit is off the request's critical path.
+
+    That commit is its own short transaction, so it runs in a worker thread
+    while the agent is thinking rather than after it. It completes even if
+    the agent call fails.
+    """
+    store_incoming = asyncio.create_task(asyncio.to_thread(_commit_incoming, db, phone, text))
+    try:
+        agent_result = await arun_agent(text) if needs_agent(text) else None
+    finally:
+        # The session is not ours to use again until the thread is done.
+        incoming = await store_incoming
+
+    reply = prepare_reply(incoming, agent_result)
+    return PipelineResult(echo_text=reply.outgoing.text, message_id=incoming.id), reply
+
+
+def handle_messages(db: Session, phone: str, texts: list[str]) -> list[PipelineResult]:
+    """
+    Batch variant of handle_message for several messages from one sender.
+
+    The agent calls run concurrently. Afterwards all incoming messages,
+    replies and Turns are written in a single transaction; results are
+    returned in input order.
+    """
+    with _keep_incoming_on_error(db, phone, *texts):
+        agent_results = iter(run_agent_batch([text for text in texts if needs_agent(text)]))
+
+    incomings = [Message(phone=phone, direction="in", text=text) for text in texts]
+    db.add_all(incomings)
+    db.flush()  # assigns incoming ids
+
+    replies = [
+        prepare_reply(incoming, next(agent_results) if needs_agent(incoming.text) else None)
+        for incoming in incomings
+    ]
+    save_replies(db, replies)
+
+    return [
+        PipelineResult(echo_text=reply.outgoing.text, message_id=incoming.id)
+        for incoming, reply in zip(incomings, replies, strict=True)
+    ]
+
+
+def handle_message_stream(
+    db: Session, phone: str, text: str, on_delta: Callable[[str], None]
+) -> PipelineResult:
+    """
+    Like handle_message, but passes the farmer-facing answer to `on_delta`
+    piece by piece while Gemini is still generating it.
+
+    The returned PipelineResult carries the final SMS text, which may differ
+    from the streamed text (warnings, markdown clean-up, length clamp).
+    """
+    agent_result: AgentResponse | None = None
+    with _keep_incoming_on_error(db, phone, text):
+        if needs_agent(text):
+            for item in run_agent_stream(text):
+                if isinstance(item, str):
+                    on_delta(item)
+                else:
+                    agent_result = item
+
+    incoming = _store_incoming(db, phone, text)
+    return process_existing_incoming_message(db=db, incoming=incoming, agent_result=agent_result)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from typing import Final
+
+from pydantic import BaseModel, Field
+
+# Upper bound for an inbound body: Twilio concatenates at most 10 segments
+# (1600 characters). Anything longer is not a real SMS and is rejected before
+# it can reach the agent.
+MAX_INBOUND_SMS_CHARS: Final[int] = 1600
+# E.164 numbers are at most 16 characters; leave room for prefixes like "whatsapp:".
+MAX_PHONE_CHARS: Final[int] = 64
 
 
 class InboundSms(BaseModel):
-    phone: str
-    text: str
+    phone: str = Field(max_length=MAX_PHONE_CHARS)
+    text: str = Field(max_length=MAX_INBOUND_SMS_CHARS)
 
 
 # Later we'll add provider-specific parsing and send_sms() functions here.
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import argparse
-from collections.abc import Iterable
+import csv
+from collections.abc import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from .db import SessionLocal, Turn
 
@@ -13,13 +17,40 @@ def _format_str(value: str | None) -> str:
     return value.strip()
 
 
-def iter_recent_turns(limit: int) -> Iterable[Turn]:
-    """Yield recent turns ordered by newest first."""
+# Columns shown by print_recent_turns / exported to CSV. Selecting just these
+# skips loading the reasoning_summary and safety_flags_json blobs.
+_TURN_COLUMNS = (
+    Turn.id,
+    Turn.created_at,
+    Turn.phone,
+    Turn.lang_detected,
+    Turn.question_tsn_raw,
+    Turn.question_en,
+    Turn.answer_en,
+    Turn.answer_tsn,
+    Turn.llm_model,
+    Turn.translation_backend,
+)
+
+
+def iter_recent_turns(limit: int) -> Iterator[Turn]:
+    """
+    Yield recent turns ordered by newest first.
+
+    Only _TURN_COLUMNS are loaded, and rows are fetched in batches of 1000
+    while the caller consumes them, so a large export never holds every turn
+    in memory at once.
+    """
     db = SessionLocal()
     try:
-        turns = db.query(Turn).order_by(Turn.created_at.desc()).limit(limit).all()
-        # detach results from session before closing
-        yield from turns
+        stmt = (
+            select(Turn)
+            .options(load_only(*_TURN_COLUMNS))
+            .order_by(Turn.created_at.desc())
+            .limit(limit)
+            .execution_options(yield_per=1000)
+        )
+        yield from db.scalars(stmt)
     finally:
         db.close()
 
@@ -48,8 +79,6 @@ def export_recent_turns_csv(limit: int, csv_path: str) -> None:
     Includes a blank 'tag' column so you can mark rows manually
     as 'ok', 'weird', 'wrong', 'unsafe', etc.
     """
-    import csv
-
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(
@@ -67,22 +96,46 @@ def export_recent_turns_csv(limit: int, csv_path: str) -> None:
                 "tag",  # for manual review
             ]
         )
-        for turn in iter_recent_turns(limit):
-            writer.writerow(
-                [
-                    turn.id,
-                    turn.created_at.isoformat() if turn.created_at else "",
-                    turn.phone,
-                    turn.lang_detected or "",
-                    _format_str(turn.question_tsn_raw),
-                    _format_str(turn.question_en),
-                    _format_str(turn.answer_en),
-                    _format_str(turn.answer_tsn),
-                    turn.llm_model or "",
-                    turn.translation_backend or "",
-                    "",  # tag left blank for you to fill in
-                ]
-            )
+        # Plain column tuples rather than Turn objects: no ORM identity map or
+        # attribute instrumentation per row, and one writerows() per batch.
+        stmt = (
+            select(*_TURN_COLUMNS)
+            .order_by(Turn.created_at.desc())
+            .limit(limit)
+            .execution_options(yield_per=1000)
+        )
+        db = SessionLocal()
+        try:
+            for rows in db.execute(stmt).partitions():
+                writer.writerows(
+                    (
+                        turn_id,
+                        created_at.isoformat() if created_at else "",
+                        phone,
+                        lang_detected or "",
+                        _format_str(question_tsn_raw),
+                        _format_str(question_en),
+                        _format_str(answer_en),
+                        _format_str(answer_tsn),
+                        llm_model or "",
+                        translation_backend or "",
+                        "",  # tag left blank for you to fill in
+                    )
+                    for (
+                        turn_id,
+                        created_at,
+                        phone,
+                        lang_detected,
+                        question_tsn_raw,
+                        question_en,
+                        answer_en,
+                        answer_tsn,
+                        llm_model,
+                        translation_backend,
+                    ) in rows
+                )
+        finally:
+            db.close()
 
 
 def main() -> None:
@@ -1,34 +1,146 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Final
+
+import httpx
+from requests import Session
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 
 from .config import get_settings
 
+# Upper bound on connections to api.twilio.com. For the async client (used by
+# the webhook via asend_sms/send_many) it caps concurrent connections, and so
+# HTTP/1.1 sends in flight; over HTTP/2 sends share connections. For the sync
+# client behind send_sms, which the app no longer calls but scripts may from
+# several threads, it is the requests pool size (default 10).
+TWILIO_POOL_MAXSIZE: Final[int] = 32
+
+TWILIO_API_BASE_URL: Final[str] = "https://api.twilio.com/2010-04-01"
+
+# Twilio error code for a send to a number that has replied STOP.
+TWILIO_OPTED_OUT_ERROR: Final[int] = 21610
+
+# Async client for asend_sms/send_many, created on first use (see
+# get_twilio_async_client) and closed by aclose_twilio_async_client.
+_async_client: httpx.AsyncClient | None = None
+
 
+def _twilio_http_client() -> TwilioHttpClient:
+    session = Session()
+    # max_retries covers connection failures, i.e. before the message was sent.
+    session.mount("https://", HTTPAdapter(pool_maxsize=TWILIO_POOL_MAXSIZE, max_retries=1))
+    http_client = TwilioHttpClient(pool_connections=True)
+    http_client.session = session
+    return http_client
+
+
+@lru_cache
 def get_twilio_client() -> Client:
-    settings = get_settings()
+    """
+    Shared Twilio client.
+
+    Created once so every outbound SMS reuses the same pooled HTTP session
+    (and its open TLS connection to api.twilio.com) instead of connecting
+    from scratch per message.
+    """
+    account_sid, auth_token = _twilio_credentials()
+    return Client(account_sid, auth_token, http_client=_twilio_http_client())
+
+
+def get_twilio_async_client() -> httpx.AsyncClient:
+    """
+    Shared async HTTP client for Twilio's Messages API.
+
+    Speaks HTTP/2 where api.twilio.com offers it, so concurrent sends from
+    send_many share one connection. Like the sync client, connection
+    failures are retried once.
+    """
+    global _async_client
+    if _async_client is None:
+        account_sid, auth_token = _twilio_credentials()
+        _async_client = httpx.AsyncClient(
+            base_url=f"{TWILIO_API_BASE_URL}/Accounts/{account_sid}/",
+            auth=(account_sid, auth_token),
+            timeout=15.0,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=1,
+                limits=httpx.Limits(max_connections=TWILIO_POOL_MAXSIZE),
+            ),
+        )
+    return _async_client
+
+
+async def aclose_twilio_async_client() -> None:
+    """Close the shared async client, if one was created."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
 
+
+def _twilio_credentials() -> tuple[str, str]:
+    settings = get_settings()
     if not settings.twilio_account_sid or not settings.twilio_auth_token:
         raise RuntimeError(
             "Twilio credentials are not configured (TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN)"
         )
+    return settings.twilio_account_sid, settings.twilio_auth_token
 
-    return Client(settings.twilio_account_sid, settings.twilio_auth_token)
+
+@lru_cache
+def get_twilio_from_number() -> str:
+    """The sender number for outbound SMS, read from settings once."""
+    from_number = get_settings().twilio_from_number
+    if not from_number:
+        raise RuntimeError("TWILIO_FROM_NUMBER is not configured")
+    return from_number
 
 
 def send_sms(to: str, body: str) -> None:
     """
     Send an SMS using the configured Twilio account.
 
-    This is used by the async background worker after the LLM has finished.
+    Blocking; async code should use asend_sms instead.
     """
-    settings = get_settings()
-    if not settings.twilio_from_number:
-        raise RuntimeError("TWILIO_FROM_NUMBER is not configured")
+    get_twilio_client().messages.create(to=to, from_=get_twilio_from_number(), body=body)
+
+
+async def asend_sms(to: str, body: str) -> None:
+    """
+    Async send_sms: POSTs straight to Twilio's Messages API.
 
-    client = get_twilio_client()
-    client.messages.create(
-        to=to,
-        from_=settings.twilio_from_number,
-        body=body,
+    Raises httpx.HTTPStatusError if Twilio rejects the message.
+    """
+    response = await get_twilio_async_client().post(
+        "Messages.json",
+        data={"To": to, "From": get_twilio_from_number(), "Body": body},
+    )
+    response.raise_for_status()
+
+
+def is_opted_out(exc: httpx.HTTPStatusError) -> bool:
+    """True if asend_sms failed because the recipient has opted out (STOP)."""
+    try:
+        code = exc.response.json().get("code")
+    except ValueError:
+        return False
+    return code == TWILIO_OPTED_OUT_ERROR
+
+
+async def send_many(messages: Iterable[tuple[str, str]]) -> list[BaseException | None]:
+    """
+    Send several (to, body) SMS concurrently.
+
+    One failed send doesn't stop the others: the result has, per message in
+    order, None if it was sent or the exception it failed with.
+    """
+    results = await asyncio.gather(
+        *(asend_sms(to, body) for to, body in messages), return_exceptions=True
     )
+    return [result if isinstance(result, BaseException) else None for result in results]
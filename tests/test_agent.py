@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+import pytest
+import requests
+from langchain_core.messages import AIMessage
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from sms_ai import agent, glossary
+
+AGENT_JSON = """{
+  "detected_language": "tsn",
+  "source_text": "Dumela",
+  "english_translation": "Hello",
+  "intent": "greeting",
+  "answer_english": "Hello, how can I help?",
+  "final_answer_user_language": "Dumela, nka go thusa jang?",
+  "safety_flags": {"mentions_dosage": false, "needs_human_review": false},
+  "reasoning_summary": "Greeting."
+}"""
+
+
+@pytest.fixture
+def fake_llm(session_factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Point the response cache at a temp DB and replace Gemini with a stub."""
+    monkeypatch.setattr(agent, "SessionLocal", session_factory)
+    monkeypatch.setattr(agent, "_memory_cache", OrderedDict[str, Any]())
+
+    calls: list[str] = []
+
+    def _fake_run(messages: list[Any]) -> AIMessage:
+        calls.append(str(messages[-1].content))
+        return AIMessage(content=AGENT_JSON)
+
+    async def _fake_arun(messages: list[Any]) -> AIMessage:
+        return _fake_run(messages)
+
+    monkeypatch.setattr(agent, "_run_llm_with_tools", _fake_run)
+    monkeypatch.setattr(agent, "_arun_llm_with_tools", _fake_arun)
+    return calls
+
+
+def test_run_agent_caches_by_normalised_text(fake_llm: list[str]) -> None:
+    first = agent.run_agent("Dumela")
+    second = agent.run_agent("  DUMELA ")
+
+    assert len(fake_llm) == 1
+    assert second["final_answer_user_language"] == first["final_answer_user_language"]
+    # source_text always reflects the message actually received.
+    assert second["source_text"] == "  DUMELA "
+
+
+def test_run_agent_bypass_cache(fake_llm: list[str]) -> None:
+    agent.run_agent("Dumela")
+    agent.run_agent("Dumela", bypass_cache=True)
+
+    assert len(fake_llm) == 2
+
+
+@pytest.mark.asyncio
+async def test_arun_agent_shares_cache_with_run_agent(fake_llm: list[str]) -> None:
+    first = await agent.arun_agent("Dumela")
+    second = agent.run_agent("dumela")
+
+    assert len(fake_llm) == 1
+    assert first["intent"] == second["intent"] == "greeting"
+
+
+def test_run_agent_memory_cache_survives_db_errors(
+    fake_llm: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    agent.run_agent("Dumela")
+
+    def _broken_session() -> Any:
+        raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(agent, "SessionLocal", _broken_session)
+    agent.run_agent("Dumela")
+
+    assert len(fake_llm) == 1
+
+
+@pytest.mark.parametrize(
+    ("name", "value"),
+    [
+        ("SYSTEM_PROMPT", agent.SYSTEM_PROMPT + " Be brief."),
+        ("AGENT_MODEL_NAME", "gemini-other"),
+        ("AGENT_TEMPERATURE", agent.AGENT_TEMPERATURE + 0.1),
+    ],
+)
+def test_response_cache_key_depends_on_prompt_and_model(
+    monkeypatch: pytest.MonkeyPatch, name: str, value: object
+) -> None:
+    seed = agent._response_cache_seed()  # type: ignore[reportPrivateUsage]
+    assert seed.digest() == agent._RESPONSE_CACHE_SEED.digest()  # type: ignore[reportPrivateUsage]
+    key = agent._response_cache_key("Dumela")  # type: ignore[reportPrivateUsage]
+
+    monkeypatch.setattr(agent, name, value)
+    monkeypatch.setattr(agent, "_RESPONSE_CACHE_SEED", agent._response_cache_seed())  # type: ignore[reportPrivateUsage]
+
+    assert agent._response_cache_key("Dumela") != key  # type: ignore[reportPrivateUsage]
+
+
+def test_response_cache_key_leaves_glossary_token_cache_alone() -> None:
+    before = glossary._normalise.cache_info().currsize  # type: ignore[reportPrivateUsage]
+
+    agent._response_cache_key("A whole SMS that should not be cached as a token")  # type: ignore[reportPrivateUsage]
+
+    assert glossary._normalise.cache_info().currsize == before  # type: ignore[reportPrivateUsage]
+
+
+def test_json_string_field_streamer_decodes_across_chunks() -> None:
+    streamer = agent._JsonStringFieldStreamer("answer")  # type: ignore[reportPrivateUsage]
+    raw = '{"other": "x", "answer": "Dumela \\"rra\\"\\n\\u00e9\\ud83c\\udf31!", "tail": 1}'
+
+    # Feed one character at a time to exercise split escapes.
+    out = "".join(streamer.feed(ch) for ch in raw)
+
+    assert out == 'Dumela "rra"\né\U0001f331!'
+
+
+def test_parse_json_tolerates_wrapping_text() -> None:
+    wrapped = (
+        "Sure! Here is the answer:\n```json\n" + AGENT_JSON + "\n```\nLet me know {if} needed."
+    )
+
+    data = agent._parse_json_from_ai(AIMessage(content=wrapped))  # type: ignore[reportPrivateUsage]
+
+    assert data["intent"] == "greeting"
+    assert data["final_answer_user_language"] == "Dumela, nka go thusa jang?"
+
+
+def test_parse_json_rejects_non_json() -> None:
+    with pytest.raises(ValueError, match="did not return valid JSON"):
+        agent._parse_json_from_ai(AIMessage(content="no json here"))  # type: ignore[reportPrivateUsage]
+
+
+def test_gemini_async_calls_use_httpx_transport(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(agent, "_agent_model", None)
+
+    client = agent.get_agent_model().client
+    assert client is not None
+    api_client = client._api_client  # type: ignore[reportPrivateUsage]
+
+    # aiohttp would bypass the HTTP/2 transport on the ainvoke path.
+    assert not api_client._use_aiohttp()  # type: ignore[reportPrivateUsage]
+    assert isinstance(api_client._async_httpx_client._transport, agent._GeminiTransport)  # type: ignore[reportPrivateUsage]
+
+
+def test_pooled_tavily_wrapper_keeps_upstream_error_message(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+
+    def _post(url: str, **kwargs: Any) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 432
+        body = b'{"detail": {"error": "This request exceeds your plan\'s set usage limit."}}'
+        response._content = body  # type: ignore[reportPrivateUsage]
+        return response
+
+    monkeypatch.setattr(agent._tavily_session, "post", _post)  # type: ignore[reportPrivateUsage]
+    wrapper = agent._PooledTavilySearchAPIWrapper()  # type: ignore[reportPrivateUsage, reportCallIssue]
+
+    with pytest.raises(ValueError, match="Error 432: This request exceeds your plan"):
+        wrapper.raw_results("maize rust")
@@ -156,3 +156,50 @@ def test_empty_glossary_file(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) ->
     assert len(idx.entries) == 0
     assert len(idx.tsn_index) == 0
     assert len(idx.en_index) == 0
+
+
+def test_index_snapshot_reused_and_invalidated(
+    sample_glossary_csv: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the pickled index is written, reused, and refreshed when the CSV changes."""
+    get_glossary_index.cache_clear()
+    monkeypatch.setenv("GLOSSARY_CSV_PATH", str(sample_glossary_csv))
+
+    from sms_ai.config import get_settings
+
+    get_settings.cache_clear()
+
+    first = get_glossary_index()
+    snapshot = sample_glossary_csv.with_name(sample_glossary_csv.name + ".index.pickle")
+    assert snapshot.is_file()
+
+    get_glossary_index.cache_clear()
+    assert get_glossary_index().entries == first.entries
+
+    # Changing the CSV (size + mtime) must invalidate the snapshot.
+    with sample_glossary_csv.open("a", encoding="utf-8") as f:
+        f.write("\nanimal,noun,phologolo,,noun")
+    get_glossary_index.cache_clear()
+    idx = get_glossary_index()
+    assert len(idx.entries) == 7
+    assert "phologolo" in idx.tsn_index
+
+
+@pytest.mark.parametrize("payload", [42, ("only-one",)])
+def test_unusable_index_snapshot_falls_back_to_csv(
+    sample_glossary_csv: Path, monkeypatch: pytest.MonkeyPatch, payload: object
+) -> None:
+    """Test that a snapshot with unexpected contents is ignored, not raised."""
+    import pickle
+
+    get_glossary_index.cache_clear()
+    monkeypatch.setenv("GLOSSARY_CSV_PATH", str(sample_glossary_csv))
+
+    from sms_ai.config import get_settings
+
+    get_settings.cache_clear()
+
+    snapshot = sample_glossary_csv.with_name(sample_glossary_csv.name + ".index.pickle")
+    snapshot.write_bytes(pickle.dumps(payload))
+
+    assert len(get_glossary_index().entries) == 6
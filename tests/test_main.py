@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from sms_ai import main
+from sms_ai.db import Message, Turn
+
+
+@pytest.fixture(autouse=True)
+def _app_sessions(session_factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main, "SessionLocal", session_factory)
+
+
+def _store_incoming(factory: sessionmaker[Session], text: str) -> int:
+    with factory() as db:
+        incoming = Message(phone="+26771000001", direction="in", text=text)
+        db.add(incoming)
+        db.commit()
+        return incoming.id
+
+
+@pytest.mark.asyncio
+async def test_webhook_records_keyword_turn_without_sending(
+    session_factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sent: list[str] = []
+
+    async def _asend_sms(to: str, body: str) -> None:
+        sent.append(body)
+
+    monkeypatch.setattr(main, "asend_sms", _asend_sms)
+    message_id = _store_incoming(session_factory, "STOP")
+
+    await main.process_and_reply_async(message_id, "+26771000001")
+
+    assert sent == []
+    with session_factory() as db:
+        assert db.scalars(select(Turn.incoming_id)).all() == [message_id]
+
+
+@pytest.mark.asyncio
+async def test_webhook_ignores_opted_out_rejection(
+    session_factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _asend_sms(to: str, body: str) -> None:
+        request = httpx.Request("POST", "https://api.twilio.com/Messages.json")
+        response = httpx.Response(400, json={"code": 21610}, request=request)
+        response.raise_for_status()
+
+    monkeypatch.setattr(main, "asend_sms", _asend_sms)
+    message_id = _store_incoming(session_factory, "123")
+
+    await main.process_and_reply_async(message_id, "+26771000001")
+
+    with session_factory() as db:
+        assert db.scalars(select(Turn.incoming_id)).all() == [message_id]
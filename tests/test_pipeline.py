@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from sms_ai import pipeline
+from sms_ai.agent import AgentResponse
+from sms_ai.db import Message, Turn
+
+
+def _fake_batch(texts: list[str]) -> list[AgentResponse]:
+    return [
+        {
+            "detected_language": "en",
+            "source_text": text,
+            "english_translation": text,
+            "intent": "other",
+            "answer_english": f"answer to {text}",
+            "final_answer_user_language": f"answer to {text}",
+            "safety_flags": {"mentions_dosage": False, "needs_human_review": False},
+            "reasoning_summary": "",
+        }
+        for text in texts
+    ]
+
+
+def test_needs_agent() -> None:
+    assert pipeline.needs_agent("Dumela")
+    assert pipeline.needs_agent("ok 2")
+    assert not pipeline.needs_agent("123 456")
+    assert not pipeline.needs_agent("?? 🙂")
+    assert not pipeline.needs_agent(" Stop! ")
+    assert pipeline.needs_agent("stop the maize rust?")
+
+
+def test_clamp_sms_counts_gsm7_septets() -> None:
+    fits = "a" * 304 + "€"  # the extension character costs two septets
+    assert pipeline.clamp_sms(fits) == fits
+    assert pipeline.clamp_sms(fits + "a") != fits + "a"
+
+    clamped = pipeline.clamp_sms("Sentence one. " + "b" * 300)
+    assert clamped == "Sentence one." + pipeline._CLAMP_TAIL  # type: ignore[reportPrivateUsage]
+
+
+def test_clamp_sms_uses_ucs2_budget_for_non_gsm_text() -> None:
+    fits = "ŋ" * 134
+    assert pipeline.clamp_sms(fits) == fits
+
+    clamped = pipeline.clamp_sms("Ŋ mo tshimong. " * 20)
+    assert clamped.endswith(pipeline._CLAMP_TAIL_UCS2)  # type: ignore[reportPrivateUsage]
+    assert 100 < len(clamped) <= 134
+
+
+_SETSWANA_REPLY = (
+    "Dumêla rra. O ka jwala di-erekisi mo kgweding ya Phukwi fa mmu o sa ntse o le mongôlô. "
+    "Tsenya monôntsha wa boloko pele o jwala, mme o nosetse gabedi mo bekeng. "
+    "Fa dinônyane di ja dipeo, di šireletse ka letlhaka kgotsa ka matlôlô a a bofiwang. "
+    "Fa o bona dikgô mo matlhareng, tlosa dimela tse di lwalang ka bonako."
+)
+
+
+def test_setswana_reply_with_diacritics_keeps_its_answer() -> None:
+    sms = pipeline.clamp_sms(pipeline.normalise_sms_text(_SETSWANA_REPLY))
+
+    assert sms.startswith("Dumela rra. O ka jwala di-erekisi")
+    assert "sireletse ka letlhaka" in sms
+    assert sms.endswith(pipeline._CLAMP_TAIL)  # type: ignore[reportPrivateUsage]
+    assert len(sms) <= pipeline.MAX_SMS_SEGMENTS * 153
+
+
+def test_normalise_sms_text_replaces_typographic_punctuation() -> None:
+    assert pipeline.normalise_sms_text("Ga \u2019 go \u201cjalo\u201d \u2014 ee\u2026") == (
+        'Ga \' go "jalo" - ee...'
+    )
+
+
+def test_handle_messages_skips_agent_without_letters(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    batches: list[list[str]] = []
+
+    def _run_agent_batch(texts: list[str]) -> list[AgentResponse]:
+        batches.append(texts)
+        return _fake_batch(texts)
+
+    monkeypatch.setattr(pipeline, "run_agent_batch", _run_agent_batch)
+
+    results = pipeline.handle_messages(db, "+27000", ["maize?", "?", "beans"])
+
+    assert batches == [["maize?", "beans"]]
+    assert [r.echo_text for r in results] == [
+        "answer to maize?",
+        pipeline.NO_QUESTION_REPLY,
+        "answer to beans",
+    ]
+    backends = db.scalars(select(Turn.translation_backend).order_by(Turn.id)).all()
+    assert backends == [
+        pipeline.AGENT_BACKEND,
+        pipeline.PASSTHROUGH_BACKEND,
+        pipeline.AGENT_BACKEND,
+    ]
+
+
+def test_handle_message_commits_turn_once(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    def _run_agent(text: str) -> AgentResponse:
+        return _fake_batch([text])[0]
+
+    commits: list[Session] = []
+
+    def _count_commit(session: Session) -> None:
+        commits.append(session)
+
+    monkeypatch.setattr(pipeline, "run_agent", _run_agent)
+    event.listen(db, "after_commit", _count_commit)
+
+    result = pipeline.handle_message(db, "+27000", "maize?")
+
+    assert result.echo_text == "answer to maize?"
+    assert len(commits) == 1
+    assert db.scalars(select(Message.direction).order_by(Message.id)).all() == ["in", "out"]
+
+
+def test_handle_message_answers_keywords_without_agent(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _run_agent(text: str) -> AgentResponse:
+        raise AssertionError("agent called")
+
+    monkeypatch.setattr(pipeline, "run_agent", _run_agent)
+
+    assert pipeline.handle_message(db, "+27000", "HELP").echo_text == pipeline.HELP_REPLY
+    assert pipeline.handle_message(db, "+27000", "unsubscribe").echo_text == pipeline.STOP_REPLY
+    turns = db.execute(select(Turn.translation_backend, Turn.llm_model)).all()
+    assert [tuple(turn) for turn in turns] == [(pipeline.PASSTHROUGH_BACKEND, None)] * 2
+
+
+def test_handle_message_keeps_incoming_when_agent_fails(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _broken_agent(text: str) -> AgentResponse:
+        raise RuntimeError("Gemini unavailable")
+
+    monkeypatch.setattr(pipeline, "run_agent", _broken_agent)
+
+    with pytest.raises(RuntimeError):
+        pipeline.handle_message(db, "+27000", "maize?")
+
+    assert db.scalars(select(Message.text)).all() == ["maize?"]
+    assert db.scalars(select(Turn)).all() == []
+
+
+def test_handle_messages_single_commit(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pipeline, "run_agent_batch", _fake_batch)
+    commits: list[Session] = []
+
+    def _count_commit(session: Session) -> None:
+        commits.append(session)
+
+    event.listen(db, "after_commit", _count_commit)
+
+    results = pipeline.handle_messages(db, "+27000", [f"q{i}" for i in range(5)])
+
+    assert len(commits) == 1
+    turns = db.scalars(select(Turn).order_by(Turn.id)).all()
+    assert [t.incoming_id for t in turns] == [r.message_id for r in results]
+    assert all(t.outgoing_id is not None for t in turns)
+
+
+@pytest.mark.asyncio
+async def test_aanswer_message_commits_incoming_only(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _arun_agent(text: str) -> AgentResponse:
+        return _fake_batch([text])[0]
+
+    monkeypatch.setattr(pipeline, "arun_agent", _arun_agent)
+
+    result, reply = await pipeline.aanswer_message(db, "+27000", "maize?")
+
+    assert result.echo_text == reply.outgoing.text == "answer to maize?"
+    assert reply.turn.incoming_id == result.message_id
+    assert db.scalars(select(Message.direction)).all() == ["in"]
+
+
+@pytest.mark.asyncio
+async def test_aanswer_message_keeps_incoming_when_agent_fails(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _arun_agent(text: str) -> AgentResponse:
+        raise RuntimeError("gemini down")
+
+    monkeypatch.setattr(pipeline, "arun_agent", _arun_agent)
+
+    with pytest.raises(RuntimeError):
+        await pipeline.aanswer_message(db, "+27000", "maize?")
+
+    assert db.scalars(select(Message.text)).all() == ["maize?"]
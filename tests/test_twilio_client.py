@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import httpx
+import pytest
+
+from sms_ai import twilio_client
+
+
+@pytest.fixture
+def sent(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[httpx.Request]]:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if b"Bad" in request.content:
+            return httpx.Response(400, json={"code": 21211})
+        return httpx.Response(201, json={"sid": "SM123"})
+
+    monkeypatch.setattr(twilio_client, "get_twilio_from_number", lambda: "+15550000000")
+    monkeypatch.setattr(
+        twilio_client,
+        "_async_client",
+        httpx.AsyncClient(
+            base_url="https://twilio.test/Accounts/AC1/", transport=httpx.MockTransport(handler)
+        ),
+    )
+    yield requests
+
+
+@pytest.mark.asyncio
+async def test_send_many_sends_all_and_reports_failures(sent: list[httpx.Request]) -> None:
+    results = await twilio_client.send_many(
+        [("+26771000001", "Dumela"), ("+26771000002", "Bad"), ("+26771000003", "Sala sentle")]
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[2] is None
+    assert len(sent) == 3
+    assert str(sent[0].url) == "https://twilio.test/Accounts/AC1/Messages.json"
+    assert b"From=%2B15550000000" in sent[0].content